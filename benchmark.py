@@ -9,7 +9,7 @@ import mgba.vfs
 import mgba.image
 import mgba.log
 
-from pygba import PyGBA, PyGBAEnv, PokemonEmerald
+from pygba import PyGBA, PyGBAEnv, PokemonEmerald, BootStateCache
 
 mgba.log.silence()
 
@@ -17,24 +17,20 @@ mgba.log.silence()
 def parse_args():
     parser = argparse.ArgumentParser()
     parser.add_argument("--gba-file", type=str, default="roms/pokemon_emerald.gba")
+    parser.add_argument("--save-file", type=str, default="saves/pokemon_emerald.new_game.sav")
     parser.add_argument("--frameskip", type=int, default=0)
     parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--profile", action="store_true")
     return parser.parse_args()
 
-def load_pokemon_game(gba_file: str, autoload_save: bool = True):
-    gba = PyGBA.load(gba_file, autoload_save=autoload_save)
-    if autoload_save:
+def load_pokemon_game(gba_file: str, save_file: str | None = None):
+    if save_file is not None:
         # skip loading screen
-        for _ in range(16):
-            gba.press_a(30)
-        gba.wait(60)
+        boot_script = [("A", 29), (None, 1)] * 16 + [(None, 60)]
     else:
         # skip loading screen and character creation
-        gba.wait(600)
-        for _ in range(120):
-            gba.press_a(30)
-        gba.wait(720)
-    return gba
+        boot_script = [(None, 600)] + [("A", 29), (None, 1)] * 120 + [(None, 720)]
+    return PyGBA.load(gba_file, save_file=save_file, boot_script=boot_script, boot_cache=BootStateCache())
 
 def benchmark_function(func, iterations=1000, warmup=10):
     print(f"Warming up for {warmup} iterations...")
@@ -51,12 +47,12 @@ def benchmark_function(func, iterations=1000, warmup=10):
     return it_per_sec
 
 def create_env(args, use_wrapper=True):
-    gba = load_pokemon_game(args.gba_file, autoload_save=True)
+    gba = load_pokemon_game(args.gba_file, save_file=args.save_file)
     if use_wrapper:
         emerald_wrapper = PokemonEmerald()
-        return PyGBAEnv(gba, emerald_wrapper, frameskip=args.frameskip)
+        return PyGBAEnv(gba, emerald_wrapper, frameskip=args.frameskip, profile=args.profile)
     else:
-        return PyGBAEnv(gba, frameskip=args.frameskip)
+        return PyGBAEnv(gba, frameskip=args.frameskip, profile=args.profile)
 
 def random_env_step(env):
     action = random.randrange(env.action_space.n)
@@ -81,6 +77,13 @@ def main(args):
     print(f"Wrapped Env. it/s: {steps_per_sec}")
     print("---")
 
+    if args.profile:
+        for phase, stats in env.get_profile().items():
+            print(
+                f"{phase:>12}: mean={stats['mean_us']:.1f}us p50={stats['p50_us']:.1f}us "
+                f"p99={stats['p99_us']:.1f}us total={stats['total_ms']:.1f}ms"
+            )
+
 if __name__ == "__main__":
     args = parse_args()
     main(args)    
@@ -61,7 +61,7 @@ class CustomEmeraldWrapper(GameWrapper):
         return 0.0
 
     def reward(self, gba: PyGBA, observation):
-        self._game_state.update(get_game_state(gba))
+        self._game_state = get_game_state(gba, previous=self._game_state)
         state = self._game_state
 
         # Game state can get funky during loading screens, so we just wait until
@@ -129,7 +129,7 @@ class CustomEmeraldWrapper(GameWrapper):
             self._game_state = get_game_state(gba)
 
         return {
-            "game_state": self._game_state,
+            "game_state": dict(self._game_state),
             "prev_reward": self._prev_reward,
             "rewards": self._reward_info,
         }
@@ -1,5 +1,11 @@
 from .gym_env import PyGBAEnv
+from .vector_env import PyGBAVectorEnv, PyGBASubprocVectorEnv
 from .pygba import PyGBA
+from .boot_cache import BootStateCache
+from .state_pool import StatePool
+from .state_codec import DeltaStateCodec, EncodedState
+from .recorder import EpisodeRecorder, load_episode
+from .profiling import StepProfiler
 from .game_wrappers.base import GameWrapper
 from .game_wrappers.pokemon_emerald import PokemonEmerald
 
@@ -7,7 +13,16 @@ from gymnasium.envs.registration import register
 
 __all__ = [
     "PyGBAEnv",
+    "PyGBAVectorEnv",
+    "PyGBASubprocVectorEnv",
     "PyGBA",
+    "BootStateCache",
+    "StatePool",
+    "DeltaStateCodec",
+    "EncodedState",
+    "EpisodeRecorder",
+    "load_episode",
+    "StepProfiler",
     "GameWrapper",
     "PokemonEmerald",
 ]
@@ -0,0 +1,86 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+
+# bump this whenever the layout of cached states changes
+_CACHE_VERSION = b"pygba-boot-state-v1"
+
+
+def cache_root() -> Path:
+    # per-user directory for all of pygba's on-disk caches
+    return Path(os.environ.get("PYGBA_CACHE_DIR", Path.home() / ".cache" / "pygba"))
+
+
+def default_cache_dir() -> Path:
+    return cache_root() / "boot_states"
+
+
+class BootStateCache:
+    """
+    A content-addressed on-disk cache of raw savestates taken after running a boot input script.
+    Entries are keyed on the ROM, the save file and the compiled boot script, and the directory is
+    kept below `max_bytes` by evicting the least recently used entries.
+    """
+
+    suffix = ".state"
+
+    def __init__(self, cache_dir: str | Path | None = None, max_bytes: int = 1 << 30):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(rom_digest: str, save_data: bytes | None, boot_runs: list[tuple[int, int]]) -> str:
+        h = hashlib.sha256(_CACHE_VERSION)
+        h.update(rom_digest.encode())
+        h.update(hashlib.sha256(save_data).digest() if save_data is not None else b"no-save")
+        h.update(repr(boot_runs).encode())
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.suffix}"
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            # mark as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            # either never cached or evicted by another process in the meantime
+            return None
+        return data
+
+    def put(self, key: str, state: bytes):
+        # write to a temporary file first so that concurrent readers never see partial states
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(state)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for path in self.cache_dir.glob(f"*{self.suffix}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_bytes -= size
+
+    def clear(self):
+        for path in self.cache_dir.glob(f"*{self.suffix}"):
+            path.unlink(missing_ok=True)
@@ -1,3 +1,7 @@
+from collections.abc import Mapping
+
+import numpy as np
+
 from .base import GameWrapper
 from .utils.emerald_utils import *
 
@@ -7,113 +11,400 @@ def get_flag(flags, flag_id):
         return False
     return bool((flags[flag_id // 8] >> (flag_id % 8)) & 1)
 
-def get_game_state(gba):
-    save_block_1 = read_save_block_1(gba)
-    save_block_2 = read_save_block_2(gba)
-    pokemon_storage = read_pokemon_storage(gba)
-    species_names = read_species_names(gba)
-
-    state = {}
-    if save_block_1 is not None:
-        flags = save_block_1["flags"]
-
-        if save_block_2 is not None and save_block_1["money"] != 0:
-            state["money"] = save_block_1["money"] ^ save_block_2["encryptionKey"]
-        state["pos"] = save_block_1["pos"]
-        state["location"] = save_block_1["location"]
-        state["lastHealLocation"] = save_block_1["lastHealLocation"]
-        state["wheather"] = save_block_1["weather"]
-        state["badges"] = [
-            get_flag(flags, FLAG_BADGE01_GET),
-            get_flag(flags, FLAG_BADGE02_GET),
-            get_flag(flags, FLAG_BADGE03_GET),
-            get_flag(flags, FLAG_BADGE04_GET),
-            get_flag(flags, FLAG_BADGE05_GET),
-            get_flag(flags, FLAG_BADGE06_GET),
-            get_flag(flags, FLAG_BADGE07_GET),
-            get_flag(flags, FLAG_BADGE08_GET),
+_BADGE_FLAGS = (
+    FLAG_BADGE01_GET,
+    FLAG_BADGE02_GET,
+    FLAG_BADGE03_GET,
+    FLAG_BADGE04_GET,
+    FLAG_BADGE05_GET,
+    FLAG_BADGE06_GET,
+    FLAG_BADGE07_GET,
+    FLAG_BADGE08_GET,
+)
+
+_VISITED_CITY_FLAGS = {
+    "littleroot": FLAG_VISITED_LITTLEROOT_TOWN,
+    "oldale": FLAG_VISITED_OLDALE_TOWN,
+    "dewford": FLAG_VISITED_DEWFORD_TOWN,
+    "lavaridge": FLAG_VISITED_LAVARIDGE_TOWN,
+    "fallarbor": FLAG_VISITED_FALLARBOR_TOWN,
+    "verdanturf": FLAG_VISITED_VERDANTURF_TOWN,
+    "pacifidlog": FLAG_VISITED_PACIFIDLOG_TOWN,
+    "petalburg": FLAG_VISITED_PETALBURG_CITY,
+    "slateport": FLAG_VISITED_SLATEPORT_CITY,
+    "mauville": FLAG_VISITED_MAUVILLE_CITY,
+    "rustboro": FLAG_VISITED_RUSTBORO_CITY,
+    "fortree": FLAG_VISITED_FORTREE_CITY,
+    "lilycove": FLAG_VISITED_LILYCOVE_CITY,
+    "mossdeep": FLAG_VISITED_MOSSDEEP_CITY,
+    "sootopolis": FLAG_VISITED_SOOTOPOLIS_CITY,
+    "evergrande": FLAG_VISITED_EVER_GRANDE_CITY,
+}
+
+_DEFEATED_GYM_FLAGS = {
+    "rustboro": FLAG_DEFEATED_RUSTBORO_GYM,
+    "dewford": FLAG_DEFEATED_DEWFORD_GYM,
+    "mauville": FLAG_DEFEATED_MAUVILLE_GYM,
+    "lavaridge": FLAG_DEFEATED_LAVARIDGE_GYM,
+    "petalburg": FLAG_DEFEATED_PETALBURG_GYM,
+    "fortree": FLAG_DEFEATED_FORTREE_GYM,
+    "mossdeep": FLAG_DEFEATED_MOSSDEEP_GYM,
+    "sootopolis": FLAG_DEFEATED_SOOTOPOLIS_GYM,
+}
+
+_ELITE_4_FLAGS = (
+    FLAG_DEFEATED_ELITE_4_SIDNEY,
+    FLAG_DEFEATED_ELITE_4_PHOEBE,
+    FLAG_DEFEATED_ELITE_4_GLACIA,
+    FLAG_DEFEATED_ELITE_4_DRAKE,
+)
+
+# keys decoded from save block 1, in the order of the state dict
+_SAVE_BLOCK_1_KEYS = (
+    "pos",
+    "location",
+    "lastHealLocation",
+    "wheather",
+    "badges",
+    "num_badges",
+    "has_pokedex",
+    "has_pokenav",
+    "is_champion",
+    "visited_cities",
+    "defeated_gyms",
+    "defeated_elite_4",
+    "party",
+    "script_flags",
+    "trainer_flags",
+    "system_flags",
+)
+_POKEDEX_KEYS = ("num_seen_pokemon", "num_caught_pokemon", "pokedex")
+
+# cached keys that only depend on the bytes of each section of the snapshot
+_SECTION_KEYS = {
+    "money": ("money",),
+    "header": ("pos", "location", "lastHealLocation", "wheather"),
+    "flags": (
+        "_flags",
+        "badges",
+        "num_badges",
+        "has_pokedex",
+        "has_pokenav",
+        "is_champion",
+        "visited_cities",
+        "defeated_gyms",
+        "defeated_elite_4",
+        "script_flags",
+        "trainer_flags",
+        "system_flags",
+    ),
+    "party": ("party",),
+    "boxes": ("boxes",),
+    "pokedex": ("_pokedex_flags",) + _POKEDEX_KEYS,
+}
+_HEADER_SIZE = SaveBlock1_dtype.fields["weather"][1] + 1
+
+
+def _field_bytes(data, dtype, name):
+    field_dtype, offset = dtype.fields[name][:2]
+    return data[offset:offset + field_dtype.itemsize]
+
+def _read_block(gba, ptr_name, size):
+    ptr = gba.read_u32(ADRESSES[ptr_name])
+    if ptr == 0:
+        return None
+    return gba.read_memory(ptr, size)
+
+
+class GameState(Mapping):
+    """
+    Read-only view of the game state that snapshots the raw save blocks, PC boxes and party
+    once and decodes every key on first access. Keys missing from the snapshot (e.g. while a
+    save block pointer is unset) fall back to the values of `previous`.
+    """
+
+    __slots__ = (
+        "_save_block_1",
+        "_save_block_2",
+        "_pokemon_storage",
+        "_party",
+        "_pokedex_table",
+        "_keys",
+        "_fallback",
+        "_cache",
+    )
+
+    def __init__(self, gba, previous=None):
+        self._save_block_1 = _read_block(gba, "gSaveBlock1Ptr", SaveBlock1_dtype.itemsize)
+        self._save_block_2 = _read_block(gba, "gSaveBlock2Ptr", SaveBlock2_dtype.itemsize)
+        self._pokemon_storage = _read_block(gba, "gPokemonStoragePtr", PokemonStorage_dtype.itemsize)
+        self._party = None
+        if self._save_block_1 is not None:
+            party_count = gba.read_u8(ADRESSES["gPlayerPartyCount"])
+            self._party = gba.read_memory(ADRESSES["gPlayerParty"], party_count * Pokemon_dtype.itemsize)
+        self._pokedex_table = None
+        if self._save_block_2 is not None:
+            self._pokedex_table = read_pokedex_table(gba)
+        self._cache = {}
+
+        keys = []
+        if self._save_block_1 is not None:
+            if self._save_block_2 is not None and self._raw_money() != 0:
+                keys.append("money")
+            keys.extend(_SAVE_BLOCK_1_KEYS)
+        if self._pokemon_storage is not None:
+            keys.append("boxes")
+        if self._pokedex_table is not None:
+            keys.extend(_POKEDEX_KEYS)
+
+        self._fallback = {}
+        if previous:
+            # same order as updating the previous state with the new keys
+            own_keys = set(keys)
+            self._fallback = {key: previous[key] for key in previous if key not in own_keys}
+            keys = list(previous) + [key for key in keys if key not in previous]
+        self._keys = keys
+
+    def __getitem__(self, key):
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        if key in self._fallback:
+            return self._fallback[key]
+        if key not in self._keys:
+            raise KeyError(key)
+        value = getattr(self, "_decode_" + key)()
+        self._cache[key] = value
+        return value
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self) -> dict:
+        return {key: self[key] for key in self._keys}
+
+    def copy(self) -> "GameState":
+        # snapshots are immutable, only the cache is not shared
+        state = GameState.__new__(GameState)
+        for name in GameState.__slots__:
+            setattr(state, name, getattr(self, name))
+        state._cache = self._cache.copy()
+        return state
+
+    def party_columns(self, fields=None):
+        """
+        Party mons decoded with `decode_box_pokemon`, or None if save block 1 isn't loaded.
+        """
+        if self._party is None:
+            return None
+        return decode_box_pokemon(np.frombuffer(self._party, dtype=Pokemon_dtype)["box"], fields)
+
+    def box_columns(self, fields=None):
+        """
+        All PC box slots decoded with `decode_box_pokemon`, or None if the storage isn't loaded.
+        """
+        if self._pokemon_storage is None:
+            return None
+        return decode_box_pokemon(_field_bytes(self._pokemon_storage, PokemonStorage_dtype, "boxes"), fields)
+
+    def _section_bytes(self, section):
+        # raw bytes of a section of `_SECTION_KEYS`, None if it isn't part of the snapshot
+        if section == "money":
+            if self._save_block_1 is None or self._save_block_2 is None:
+                return None
+            return (
+                _field_bytes(self._save_block_1, SaveBlock1_dtype, "money")
+                + _field_bytes(self._save_block_2, SaveBlock2_dtype, "encryptionKey")
+            )
+        if section == "header":
+            return None if self._save_block_1 is None else self._save_block_1[:_HEADER_SIZE]
+        if section == "flags":
+            return None if self._save_block_1 is None else _field_bytes(self._save_block_1, SaveBlock1_dtype, "flags")
+        if section == "party":
+            return self._party
+        if section == "boxes":
+            if self._pokemon_storage is None:
+                return None
+            return _field_bytes(self._pokemon_storage, PokemonStorage_dtype, "boxes")
+        if section == "pokedex":
+            return None if self._pokedex_table is None else _field_bytes(self._save_block_2, SaveBlock2_dtype, "pokedex")
+        raise ValueError(f"Invalid section: {section}")
+
+    def _raw_money(self):
+        return int.from_bytes(_field_bytes(self._save_block_1, SaveBlock1_dtype, "money"), "little")
+
+    def _flags(self):
+        try:
+            return self._cache["_flags"]
+        except KeyError:
+            flags = self._cache["_flags"] = _field_bytes(self._save_block_1, SaveBlock1_dtype, "flags")
+            return flags
+
+    def _decode_money(self):
+        key = int.from_bytes(_field_bytes(self._save_block_2, SaveBlock2_dtype, "encryptionKey"), "little")
+        return self._raw_money() ^ key
+
+    def _decode_pos(self):
+        data = _field_bytes(self._save_block_1, SaveBlock1_dtype, "pos")
+        return Coords16._make(Coords16_struct.unpack(data))._asdict()
+
+    def _decode_warp(self, name):
+        data = _field_bytes(self._save_block_1, SaveBlock1_dtype, name)
+        return WarpData._make(WarpData_struct.unpack(data))._asdict()
+
+    def _decode_location(self):
+        return self._decode_warp("location")
+
+    def _decode_lastHealLocation(self):
+        return self._decode_warp("lastHealLocation")
+
+    def _decode_wheather(self):
+        return _field_bytes(self._save_block_1, SaveBlock1_dtype, "weather")[0]
+
+    def _decode_badges(self):
+        flags = self._flags()
+        return [get_flag(flags, flag) for flag in _BADGE_FLAGS]
+
+    def _decode_num_badges(self):
+        return sum(self["badges"])
+
+    def _decode_has_pokedex(self):
+        return get_flag(self._flags(), FLAG_SYS_POKEDEX_GET)
+
+    def _decode_has_pokenav(self):
+        return get_flag(self._flags(), FLAG_SYS_POKENAV_GET)
+
+    def _decode_is_champion(self):
+        return get_flag(self._flags(), FLAG_IS_CHAMPION)
+
+    def _decode_visited_cities(self):
+        flags = self._flags()
+        return {city: get_flag(flags, flag) for city, flag in _VISITED_CITY_FLAGS.items()}
+
+    def _decode_defeated_gyms(self):
+        flags = self._flags()
+        return {gym: get_flag(flags, flag) for gym, flag in _DEFEATED_GYM_FLAGS.items()}
+
+    def _decode_defeated_elite_4(self):
+        flags = self._flags()
+        return [get_flag(flags, flag) for flag in _ELITE_4_FLAGS]
+
+    def _decode_party(self):
+        return [
+            parse_pokemon(self._party[i:i + Pokemon_struct.size])
+            for i in range(0, len(self._party), Pokemon_struct.size)
         ]
-        state["num_badges"] = sum(state["badges"])
-        state["has_pokedex"] = get_flag(flags, FLAG_SYS_POKEDEX_GET)
-        state["has_pokenav"] = get_flag(flags, FLAG_SYS_POKENAV_GET)
-        state["is_champion"] = get_flag(flags, FLAG_IS_CHAMPION)
-
-        state["visited_cities"] = {
-            "littleroot": get_flag(flags, FLAG_VISITED_LITTLEROOT_TOWN),
-            "oldale": get_flag(flags, FLAG_VISITED_OLDALE_TOWN),
-            "dewford": get_flag(flags, FLAG_VISITED_DEWFORD_TOWN),
-            "lavaridge": get_flag(flags, FLAG_VISITED_LAVARIDGE_TOWN),
-            "fallarbor": get_flag(flags, FLAG_VISITED_FALLARBOR_TOWN),
-            "verdanturf": get_flag(flags, FLAG_VISITED_VERDANTURF_TOWN),
-            "pacifidlog": get_flag(flags, FLAG_VISITED_PACIFIDLOG_TOWN),
-            "petalburg": get_flag(flags, FLAG_VISITED_PETALBURG_CITY),
-            "slateport": get_flag(flags, FLAG_VISITED_SLATEPORT_CITY),
-            "mauville": get_flag(flags, FLAG_VISITED_MAUVILLE_CITY),
-            "rustboro": get_flag(flags, FLAG_VISITED_RUSTBORO_CITY),
-            "fortree": get_flag(flags, FLAG_VISITED_FORTREE_CITY),
-            "lilycove": get_flag(flags, FLAG_VISITED_LILYCOVE_CITY),
-            "mossdeep": get_flag(flags, FLAG_VISITED_MOSSDEEP_CITY),
-            "sootopolis": get_flag(flags, FLAG_VISITED_SOOTOPOLIS_CITY),
-            "evergrande": get_flag(flags, FLAG_VISITED_EVER_GRANDE_CITY),
-        }
 
-        state["defeated_gyms"] = {
-            "rustboro": get_flag(flags, FLAG_DEFEATED_RUSTBORO_GYM),
-            "dewford": get_flag(flags, FLAG_DEFEATED_DEWFORD_GYM),
-            "mauville": get_flag(flags, FLAG_DEFEATED_MAUVILLE_GYM),
-            "lavaridge": get_flag(flags, FLAG_DEFEATED_LAVARIDGE_GYM),
-            "petalburg": get_flag(flags, FLAG_DEFEATED_PETALBURG_GYM),
-            "fortree": get_flag(flags, FLAG_DEFEATED_FORTREE_GYM),
-            "mossdeep": get_flag(flags, FLAG_DEFEATED_MOSSDEEP_GYM),
-            "sootopolis": get_flag(flags, FLAG_DEFEATED_SOOTOPOLIS_GYM),
+    def _decode_script_flags(self):
+        return self._flags()[SCRIPT_FLAGS_START // 8 : TRAINER_FLAGS_START // 8]
+
+    def _decode_trainer_flags(self):
+        return self._flags()[TRAINER_FLAGS_START // 8 : SYSTEM_FLAGS_START // 8]
+
+    def _decode_system_flags(self):
+        return self._flags()[SYSTEM_FLAGS_START // 8 : DAILY_FLAGS_START // 8]
+
+    def _decode_boxes(self):
+        columns = self.box_columns()
+        stored = columns["present"] & (columns["species"] != 0)
+        return box_pokemon_dicts({name: column[stored] for name, column in columns.items()})
+
+    def pokedex_flags(self):
+        """
+        Boolean arrays of the seen and caught flags of the species 1 to NUM_SPECIES - 1, or None
+        if save block 2 isn't loaded.
+        """
+        if self._pokedex_table is None:
+            return None
+        try:
+            return self._cache["_pokedex_flags"]
+        except KeyError:
+            pass
+        pokedex_data = _field_bytes(self._save_block_2, SaveBlock2_dtype, "pokedex")
+        _, bits = self._pokedex_table
+        seen = np.unpackbits(np.frombuffer(_field_bytes(pokedex_data, Pokedex_dtype, "seen"), np.uint8), bitorder="little")
+        owned = np.unpackbits(np.frombuffer(_field_bytes(pokedex_data, Pokedex_dtype, "owned"), np.uint8), bitorder="little")
+        flags = self._cache["_pokedex_flags"] = (seen[bits].astype(bool), owned[bits].astype(bool))
+        return flags
+
+    def _decode_num_seen_pokemon(self):
+        return int(np.count_nonzero(self.pokedex_flags()[0]))
+
+    def _decode_num_caught_pokemon(self):
+        return int(np.count_nonzero(self.pokedex_flags()[1]))
+
+    def _decode_pokedex(self):
+        names, _ = self._pokedex_table
+        seen, owned = self.pokedex_flags()
+        return {
+            name: {"seen": seen, "caught": owned}
+            for name, seen, owned in zip(names, seen.tolist(), owned.tolist())
         }
 
-        state["defeated_elite_4"] = [
-            get_flag(flags, FLAG_DEFEATED_ELITE_4_SIDNEY),
-            get_flag(flags, FLAG_DEFEATED_ELITE_4_PHOEBE),
-            get_flag(flags, FLAG_DEFEATED_ELITE_4_GLACIA),
-            get_flag(flags, FLAG_DEFEATED_ELITE_4_DRAKE),
-        ]
 
-        state["party"] = save_block_1["playerParty"]
-
-        script_flags = flags[SCRIPT_FLAGS_START // 8 : TRAINER_FLAGS_START // 8]
-        trainer_flags = flags[TRAINER_FLAGS_START // 8 : SYSTEM_FLAGS_START // 8]
-        system_flags = flags[SYSTEM_FLAGS_START // 8 : DAILY_FLAGS_START // 8]
-        state["script_flags"] = script_flags
-        state["trainer_flags"] = trainer_flags
-        state["system_flags"] = system_flags
-
-    if pokemon_storage is not None:
-        stored_mons = [
-            boxed_mon
-            for box in pokemon_storage["boxes"]
-            for boxed_mon in box
-            if boxed_mon is not None and boxed_mon["substructs"][0]["species"] != 0
-        ]
-        state["boxes"] = stored_mons
-
-    if save_block_2 is not None and species_names is not None:
-        pokedex = {}
-        num_seen = 0
-        num_owned = 0
-        for i in range(1, NUM_SPECIES):
-            name = species_names[i].lower()
-            dex_number = gba.read_u16(ADRESSES["sSpeciesToNationalPokedexNum"] + (i - 1) * 2)
-            dex_number -= 1
-            index = dex_number // 8
-            mask = 1 << dex_number % 8
-            seen = save_block_2["pokedex"]["seen"][index] & mask > 0
-            owned = save_block_2["pokedex"]["owned"][index] & mask > 0
-            num_seen += 1 if seen else 0
-            num_owned += 1 if owned else 0
-            pokedex[name] = {"seen": seen, "caught": owned}
-
-        state["num_seen_pokemon"] = num_seen
-        state["num_caught_pokemon"] = num_owned
-        state["pokedex"] = pokedex
-
-    return state
+def get_game_state(gba, previous=None) -> GameState:
+    return GameState(gba, previous)
+
+
+class GameStateTracker:
+    """
+    Builds a `GameState` every step, but reuses the decoded values of every section whose raw
+    bytes didn't change since it was last decoded. `changed` holds the sections that changed in
+    the last `update`. Reused values are shared between states and must not be modified.
+    """
+
+    def __init__(self):
+        self.state = None
+        self.changed = set()
+        # section -> raw bytes and decoded values of the last snapshot that contained it
+        self._section_bytes = {}
+        self._section_values = {}
+
+    def update(self, gba) -> GameState:
+        previous = self.state
+        if previous is not None:
+            self._collect(previous)
+
+        state = GameState(gba, previous)
+        self.changed = set()
+        for section in _SECTION_KEYS:
+            data = state._section_bytes(section)
+            if data is None:
+                continue
+            if data == self._section_bytes.get(section):
+                state._cache.update(self._section_values[section])
+            else:
+                self._section_bytes[section] = data
+                self._section_values[section] = {}
+                self.changed.add(section)
+        self.state = state
+        return state
+
+    def reset(self):
+        self.state = None
+        self.changed = set()
+        self._section_bytes = {}
+        self._section_values = {}
+
+    def _collect(self, state):
+        # keep the values that were decoded from the sections of the last snapshot
+        for section, keys in _SECTION_KEYS.items():
+            if state._section_bytes(section) is None:
+                continue
+            values = self._section_values[section]
+            for key in keys:
+                if key in state._cache:
+                    values[key] = state._cache[key]
 
 
 def count_changed_flags(old_flags, new_flags):
@@ -159,6 +450,21 @@ def get_gained_exp(mon, species_info, experience_tables):
     exp_at_met_level = experience_tables[growth_rate][level]
     return exp - exp_at_met_level
 
+_GAINED_EXP_FIELDS = ("present", "species", "experience", "metLevel")
+
+def get_gained_exp_batch(columns, growth_rates, experience_tables):
+    """
+    Vectorized `get_gained_exp` over columns from `decode_box_pokemon`, empty slots and mons
+    with an invalid met level, species or growth rate gain nothing.
+    """
+    species = columns["species"]
+    level = columns["metLevel"]
+    valid = columns["present"] & (species < len(growth_rates)) & (level <= 100)
+    growth_rate = growth_rates[np.where(valid, species, 0)]
+    valid &= growth_rate < len(experience_tables)
+    exp_at_met_level = experience_tables[np.where(valid, growth_rate, 0), np.where(valid, level, 0)]
+    return np.where(valid, columns["experience"].astype(np.int64) - exp_at_met_level, 0)
+
 
 class PokemonEmerald(GameWrapper):
     def __init__(
@@ -184,20 +490,33 @@ class PokemonEmerald(GameWrapper):
         self.exp_reward_scale = exp_reward_scale
 
         self._total_script_flags = 0
+        self._party_gained_exp = 0
+        self._boxes_gained_exp = 0
         self._prev_reward = 0.0
         self._game_state = {}
         self._prev_game_state = {}
+        self._state_tracker = GameStateTracker()
 
     def game_state(self, gba):
         return get_game_state(gba)
 
     def reward(self, gba, observation):
-        if self._game_state is None:
-            self._game_state = get_game_state(gba)
-        else:
-            self._game_state.update(get_game_state(gba))
+        self._game_state = self._state_tracker.update(gba)
         state = self._game_state
 
+        # the exp gained by the mons of a section is only recomputed when its bytes changed,
+        # and kept from the last snapshot that contained it otherwise
+        changed = self._state_tracker.changed
+        growth_rates = read_growth_rates(gba)
+        experience_tables = read_experience_table_array(gba)
+        if "party" in changed:
+            party = state.party_columns(_GAINED_EXP_FIELDS)
+            self._party_gained_exp = int(get_gained_exp_batch(party, growth_rates, experience_tables).sum())
+        if "boxes" in changed:
+            boxes = state.box_columns(_GAINED_EXP_FIELDS)
+            gained_exp = get_gained_exp_batch(boxes, growth_rates, experience_tables)
+            self._boxes_gained_exp = int(gained_exp[boxes["species"] != 0].sum())
+
         # Game state can get funky during loading screens, so we just wait until
         # we get a valid observation.
         if observation is not None and observation.sum() < 1:
@@ -211,10 +530,7 @@ class PokemonEmerald(GameWrapper):
         changed_script_flags = count_changed_flags(prev_script_flags, new_script_flags)
         self._total_script_flags += changed_script_flags
 
-        species_info = read_species_info(gba)
-        experience_tables = read_experience_tables(gba)
-        all_mons = list(map(lambda x: x["box"], state.get("party", []))) + state.get("boxes", [])
-        total_gained_exp = sum(get_gained_exp(mon, species_info, experience_tables) for mon in all_mons)
+        total_gained_exp = self._party_gained_exp + self._boxes_gained_exp
         exp_reward = total_gained_exp ** (1 / 3)
 
         reward = (
@@ -239,7 +555,10 @@ class PokemonEmerald(GameWrapper):
     
     def reset(self, gba):
         self._game_state = {}
+        self._state_tracker.reset()
         self._total_script_flags = 0
+        self._party_gained_exp = 0
+        self._boxes_gained_exp = 0
         self._prev_reward = 0.0
         self._prev_reward = self.reward(gba, None)
         self._prev_game_state = {}
@@ -249,6 +568,6 @@ class PokemonEmerald(GameWrapper):
             self._game_state = self.game_state(gba)
 
         return {
-            "game_state": self._game_state,
+            "game_state": dict(self._game_state),
             "prev_reward": self._prev_reward,
         }
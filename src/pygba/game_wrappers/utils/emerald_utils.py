@@ -1,7 +1,10 @@
 import functools
+import re
 import struct
 from collections import namedtuple
 
+import numpy as np
+
 from pygba.utils import BaseCharmap
 
 
@@ -128,6 +131,7 @@ class EmeraldCharmap(BaseCharmap):
     ]
     terminator = 0xFF
 
+emerald_charmap = EmeraldCharmap()
 
 PokemonSubstruct0_spec = (
     ("species", "H"),
@@ -139,10 +143,12 @@ PokemonSubstruct0_spec = (
 )
 PokemonSubstruct0 = namedtuple("PokemonSubstruct0", [x[0] for x in PokemonSubstruct0_spec])
 PokemonSubstruct0_format = "".join([x[1] for x in PokemonSubstruct0_spec])
+PokemonSubstruct0_struct = struct.Struct("<" + PokemonSubstruct0_format)
 
 PokemonSubstruct1_spec = None
 PokemonSubstruct1 = namedtuple("PokemonSubstruct1", ("moves", "pp"))
 PokemonSubstruct1_format = "4H4B"
+PokemonSubstruct1_struct = struct.Struct("<" + PokemonSubstruct1_format)
 
 PokemonSubstruct2_spec = (
     ("hpEV", "B"),
@@ -160,9 +166,11 @@ PokemonSubstruct2_spec = (
 )
 PokemonSubstruct2 = namedtuple("PokemonSubstruct2", [x[0] for x in PokemonSubstruct2_spec])
 PokemonSubstruct2_format = "".join([x[1] for x in PokemonSubstruct2_spec])
+PokemonSubstruct2_struct = struct.Struct("<" + PokemonSubstruct2_format)
 
 PokemonSubstruct3_spec = None
 PokemonSubstruct3_format = "III"
+PokemonSubstruct3_struct = struct.Struct("<" + PokemonSubstruct3_format)
 PokemonSubstruct3 = namedtuple("PokemonSubstruct3", (
     "pokerus",
     "metLocation",
@@ -196,10 +204,11 @@ BoxPokemon_spec = (
 )
 BoxPokemon = namedtuple("BoxPokemon", [x[0] for x in BoxPokemon_spec])
 BoxPokemon_format = "".join([x[1] for x in BoxPokemon_spec])
+BoxPokemon_struct = struct.Struct("<" + BoxPokemon_format)
 
 
 Pokemon_spec = (
-    ("box", f"{struct.calcsize(BoxPokemon_format)}s"),
+    ("box", f"{BoxPokemon_struct.size}s"),
     ("status", "I"),
     ("level", "B"),
     ("mail", "B"),
@@ -213,6 +222,7 @@ Pokemon_spec = (
 )
 Pokemon = namedtuple("Pokemon", [x[0] for x in Pokemon_spec])
 Pokemon_format = "".join([x[1] for x in Pokemon_spec])
+Pokemon_struct = struct.Struct("<" + Pokemon_format)
 
 
 Pokedex_spec = (
@@ -228,6 +238,7 @@ Pokedex_spec = (
 )
 Pokedex = namedtuple("Pokedex", [x[0] for x in Pokedex_spec])
 Pokedex_format = "".join([x[1] for x in Pokedex_spec])
+Pokedex_struct = struct.Struct("<" + Pokedex_format)
 
 
 SpeciesInfo_spec = (
@@ -257,6 +268,7 @@ SpeciesInfo_spec = (
 )
 SpeciesInfo = namedtuple("SpeciesInfo", [x[0] for x in SpeciesInfo_spec])
 SpeciesInfo_format = "".join([x[1] for x in SpeciesInfo_spec])
+SpeciesInfo_struct = struct.Struct("<" + SpeciesInfo_format)
 
 Coords16_spec = (
     ("x", "H"),
@@ -264,6 +276,7 @@ Coords16_spec = (
 )
 Coords16 = namedtuple("Coords16", [x[0] for x in Coords16_spec])
 Coords16_format = "".join([x[1] for x in Coords16_spec])
+Coords16_struct = struct.Struct("<" + Coords16_format)
 
 WarpData_spec = (
     ("mapGroup", "b"),
@@ -274,6 +287,7 @@ WarpData_spec = (
 )
 WarpData = namedtuple("WarpData", [x[0] for x in WarpData_spec])
 WarpData_format = "".join([x[1] for x in WarpData_spec])
+WarpData_struct = struct.Struct("<" + WarpData_format)
 
 ItemSlot_spec = (
     ("itemId", "H"),
@@ -281,6 +295,7 @@ ItemSlot_spec = (
 )
 ItemSlot = namedtuple("ItemSlot", [x[0] for x in ItemSlot_spec])
 ItemSlot_format = "".join([x[1] for x in ItemSlot_spec])
+ItemSlot_struct = struct.Struct("<" + ItemSlot_format)
 
 SaveBlock2_spec = (
     ("playerName", f"{PLAYER_NAME_LENGTH + 1}s"),
@@ -294,7 +309,7 @@ SaveBlock2_spec = (
     ("optionsButtonMode", "B"),
     ("options", "H"),
     ("padding1", "2s"),
-    ("pokedex", f"{struct.calcsize(Pokedex_format)}s"),
+    ("pokedex", f"{Pokedex_struct.size}s"),
     ("filler_90", "8s"),
     ("localTimeOffset", "8s"),
     ("lastBerryTreeUpdate", "8s"),
@@ -304,14 +319,15 @@ SaveBlock2_spec = (
 )
 SaveBlock2 = namedtuple("SaveBlock2", [x[0] for x in SaveBlock2_spec])
 SaveBlock2_format = "".join([x[1] for x in SaveBlock2_spec])
+SaveBlock2_struct = struct.Struct("<" + SaveBlock2_format)
 
 SaveBlock1_spec = (
-    ("pos", f"{struct.calcsize(Coords16_format)}s"),
-    ("location", f"{struct.calcsize(WarpData_format)}s"),
-    ("continueGameWarp", f"{struct.calcsize(WarpData_format)}s"),
-    ("dynamicWarp", f"{struct.calcsize(WarpData_format)}s"),
-    ("lastHealLocation", f"{struct.calcsize(WarpData_format)}s"),
-    ("escapeWarp", f"{struct.calcsize(WarpData_format)}s"),
+    ("pos", f"{Coords16_struct.size}s"),
+    ("location", f"{WarpData_struct.size}s"),
+    ("continueGameWarp", f"{WarpData_struct.size}s"),
+    ("dynamicWarp", f"{WarpData_struct.size}s"),
+    ("lastHealLocation", f"{WarpData_struct.size}s"),
+    ("escapeWarp", f"{WarpData_struct.size}s"),
     ("savedMusic", "H"),
     ("weather", "B"),
     ("weatherCycleStage", "B"),
@@ -325,12 +341,12 @@ SaveBlock1_spec = (
     ("money", "I"),
     ("coins", "H"),
     ("registeredItem", "H"),
-    ("pcItems", f"{struct.calcsize(ItemSlot_format) * PC_ITEMS_COUNT}s"),
-    ("bagPocket_Items", f"{struct.calcsize(ItemSlot_format) * BAG_ITEMS_COUNT}s"),
-    ("bagPocket_KeyItems", f"{struct.calcsize(ItemSlot_format) * BAG_KEYITEMS_COUNT}s"),
-    ("bagPocket_PokeBalls", f"{struct.calcsize(ItemSlot_format) * BAG_POKEBALLS_COUNT}s"),
-    ("bagPocket_TMHM", f"{struct.calcsize(ItemSlot_format) * BAG_TMHM_COUNT}s"),
-    ("bagPocket_Berries", f"{struct.calcsize(ItemSlot_format) * BAG_BERRIES_COUNT}s"),
+    ("pcItems", f"{ItemSlot_struct.size * PC_ITEMS_COUNT}s"),
+    ("bagPocket_Items", f"{ItemSlot_struct.size * BAG_ITEMS_COUNT}s"),
+    ("bagPocket_KeyItems", f"{ItemSlot_struct.size * BAG_KEYITEMS_COUNT}s"),
+    ("bagPocket_PokeBalls", f"{ItemSlot_struct.size * BAG_POKEBALLS_COUNT}s"),
+    ("bagPocket_TMHM", f"{ItemSlot_struct.size * BAG_TMHM_COUNT}s"),
+    ("bagPocket_Berries", f"{ItemSlot_struct.size * BAG_BERRIES_COUNT}s"),
     ("pokeblocks", f"{320}s"),
     ("seen1", f"{NUM_DEX_FLAG_BYTES}s"),
     ("berryBlenderRecords", "6s"),
@@ -345,46 +361,116 @@ SaveBlock1_spec = (
 )
 SaveBlock1 = namedtuple("SaveBlock1", [x[0] for x in SaveBlock1_spec])
 SaveBlock1_format = "".join([x[1] for x in SaveBlock1_spec])
+SaveBlock1_struct = struct.Struct("<" + SaveBlock1_format)
 
 
 PokemonStorage_spec = (
     ("currentBox", "B"),
     ("padding", "3s"),  # 3 bytes padding
-    ("boxes", f"{struct.calcsize(BoxPokemon_format) * TOTAL_BOXES_COUNT * IN_BOX_COUNT}s"),
+    ("boxes", f"{BoxPokemon_struct.size * TOTAL_BOXES_COUNT * IN_BOX_COUNT}s"),
     ("boxNames", f"{TOTAL_BOXES_COUNT * (BOX_NAME_LENGTH + 1)}s"),
     ("boxWallpapers", f"{TOTAL_BOXES_COUNT}s"),
 )
 PokemonStorage = namedtuple("PokemonStorage", [x[0] for x in PokemonStorage_spec])
 PokemonStorage_format = "".join([x[1] for x in PokemonStorage_spec])
+PokemonStorage_struct = struct.Struct("<" + PokemonStorage_format)
+
+
+## NumPy record layouts
+
+_NUMPY_CODES = {"b": "i1", "B": "u1", "h": "<i2", "H": "<u2", "i": "<i4", "I": "<u4", "q": "<i8", "Q": "<u8"}
+
+def spec_to_dtype(spec, nested=None) -> np.dtype:
+    """
+    Builds a structured dtype with the same packed little-endian layout as `spec`. Byte string
+    fields become uint8 subarrays, unless their dtype is given in `nested`.
+    """
+    nested = nested or {}
+    names, formats, offsets = [], [], []
+    offset = 0
+    for name, format in spec:
+        field_offset = offset
+        field_dtype = None
+        for count, code in re.findall(r"(\d*)([a-zA-Z])", format):
+            count = int(count) if count else 1
+            if code == "x":
+                pass
+            elif code == "s":
+                field_dtype = (np.uint8, (count,))
+            else:
+                field_dtype = np.dtype(_NUMPY_CODES[code]) if count == 1 else (_NUMPY_CODES[code], (count,))
+            offset += struct.calcsize(f"<{count}{code}")
+        if name in nested:
+            field_dtype = nested[name]
+        names.append(name)
+        formats.append(field_dtype)
+        offsets.append(field_offset)
+    return np.dtype({"names": names, "formats": formats, "offsets": offsets, "itemsize": offset})
+
+
+BoxPokemon_dtype = spec_to_dtype(BoxPokemon_spec, {"substructs": ("<u4", (12,))})
+Pokemon_dtype = spec_to_dtype(Pokemon_spec, {"box": BoxPokemon_dtype})
+Pokedex_dtype = spec_to_dtype(Pokedex_spec)
+SpeciesInfo_dtype = spec_to_dtype(SpeciesInfo_spec)
+Coords16_dtype = spec_to_dtype(Coords16_spec)
+WarpData_dtype = spec_to_dtype(WarpData_spec)
+ItemSlot_dtype = spec_to_dtype(ItemSlot_spec)
+SaveBlock2_dtype = spec_to_dtype(SaveBlock2_spec, {"pokedex": Pokedex_dtype})
+SaveBlock1_dtype = spec_to_dtype(SaveBlock1_spec, {
+    "pos": Coords16_dtype,
+    "location": WarpData_dtype,
+    "continueGameWarp": WarpData_dtype,
+    "dynamicWarp": WarpData_dtype,
+    "lastHealLocation": WarpData_dtype,
+    "escapeWarp": WarpData_dtype,
+    "playerParty": (Pokemon_dtype, (6,)),
+    "pcItems": (ItemSlot_dtype, (PC_ITEMS_COUNT,)),
+    "bagPocket_Items": (ItemSlot_dtype, (BAG_ITEMS_COUNT,)),
+    "bagPocket_KeyItems": (ItemSlot_dtype, (BAG_KEYITEMS_COUNT,)),
+    "bagPocket_PokeBalls": (ItemSlot_dtype, (BAG_POKEBALLS_COUNT,)),
+    "bagPocket_TMHM": (ItemSlot_dtype, (BAG_TMHM_COUNT,)),
+    "bagPocket_Berries": (ItemSlot_dtype, (BAG_BERRIES_COUNT,)),
+})
+PokemonStorage_dtype = spec_to_dtype(PokemonStorage_spec, {
+    "boxes": (BoxPokemon_dtype, (TOTAL_BOXES_COUNT, IN_BOX_COUNT)),
+    "boxNames": ("S" + str(BOX_NAME_LENGTH + 1), (TOTAL_BOXES_COUNT,)),
+})
+
+
+
+_substructs_struct = struct.Struct("<12I")
+_substruct_words_struct = struct.Struct("<3I")
+
+_substruct_selector = [
+    [0, 1, 2, 3], [0, 1, 3, 2], [0, 2, 1, 3], [0, 3, 1, 2],
+    [0, 2, 3, 1], [0, 3, 2, 1], [1, 0, 2, 3], [1, 0, 3, 2],
+    [2, 0, 1, 3], [3, 0, 1, 2], [2, 0, 3, 1], [3, 0, 2, 1],
+    [1, 2, 0, 3], [1, 3, 0, 2], [2, 1, 0, 3], [3, 1, 0, 2],
+    [2, 3, 0, 1], [3, 2, 0, 1], [1, 2, 3, 0], [1, 3, 2, 0],
+    [2, 1, 3, 0], [3, 1, 2, 0], [2, 3, 1, 0], [3, 2, 1, 0],
+]
+_substruct_selector_array = np.array(_substruct_selector, dtype=np.intp)
 
 
 def parse_box_pokemon(data):
     if int.from_bytes(data[:4], "little") == 0:
         return None
 
-    box = BoxPokemon._make(struct.unpack("<" + BoxPokemon_format, data))
+    box = BoxPokemon._make(BoxPokemon_struct.unpack(data))
     
     key = box.otId ^ box.personality
-    substructs_raw = struct.unpack("<" + "I" * 12, box.substructs)
+    substructs_raw = _substructs_struct.unpack(box.substructs)
     substructs = [x ^ key for x in substructs_raw]
 
-    substructSelector = [
-		[0, 1, 2, 3], [0, 1, 3, 2], [0, 2, 1, 3], [0, 3, 1, 2],
-		[0, 2, 3, 1], [0, 3, 2, 1], [1, 0, 2, 3], [1, 0, 3, 2],
-		[2, 0, 1, 3], [3, 0, 1, 2], [2, 0, 3, 1], [3, 0, 2, 1],
-		[1, 2, 0, 3], [1, 3, 0, 2], [2, 1, 0, 3], [3, 1, 0, 2],
-		[2, 3, 0, 1], [3, 2, 0, 1], [1, 2, 3, 0], [1, 3, 2, 0],
-		[2, 1, 3, 0], [3, 1, 2, 0], [2, 3, 1, 0], [3, 2, 1, 0],
-    ]
     # get substruct permutation by personality mod 24
-    perm = substructSelector[box.personality % 24]
+    perm = _substruct_selector[box.personality % 24]
     substruct0 = substructs[3 * perm[0] : 3 * (perm[0] + 1)]
     substruct1 = substructs[3 * perm[1] : 3 * (perm[1] + 1)]
     substruct2 = substructs[3 * perm[2] : 3 * (perm[2] + 1)]
     substruct3 = substructs[3 * perm[3] : 3 * (perm[3] + 1)]
 
-    substruct0 = PokemonSubstruct0._make(struct.unpack("<" + PokemonSubstruct0_format, struct.pack("<" + "I" * 3, *substruct0)))
-    substruct2 = PokemonSubstruct2._make(struct.unpack("<" + PokemonSubstruct2_format, struct.pack("<" + "I" * 3, *substruct2)))
+    substruct0 = PokemonSubstruct0._make(PokemonSubstruct0_struct.unpack(_substruct_words_struct.pack(*substruct0)))
+    substruct2 = PokemonSubstruct2._make(PokemonSubstruct2_struct.unpack(_substruct_words_struct.pack(*substruct2)))
 
     x1, x2, x3 = substruct1
     substruct1 = PokemonSubstruct1(
@@ -422,8 +508,8 @@ def parse_box_pokemon(data):
     )
 
     box = box._replace(
-        nickname=EmeraldCharmap().decode(box.nickname),
-        otName=EmeraldCharmap().decode(box.otName),
+        nickname=emerald_charmap.decode(box.nickname),
+        otName=emerald_charmap.decode(box.otName),
         substructs=(
             substruct0._asdict(),
             substruct1._asdict(),
@@ -438,20 +524,23 @@ def parse_box_pokemon(data):
     return box
 
 def parse_pokemon(data):
-    pokemon = Pokemon._make(struct.unpack("<" + Pokemon_format, data))
+    pokemon = Pokemon._make(Pokemon_struct.unpack(data))
     box = parse_box_pokemon(pokemon.box)
     pokemon = pokemon._replace(box=box)
     return pokemon._asdict()
 
+def _parse_item_slots(data):
+    return [ItemSlot._make(item)._asdict() for item in ItemSlot_struct.iter_unpack(data)]
+
 
 def read_save_block_2(gba):
     save_block_2_ptr = gba.read_u32(ADRESSES["gSaveBlock2Ptr"])
     if save_block_2_ptr == 0:
         return None
 
-    save_block_2_data = gba.read_memory(save_block_2_ptr, struct.calcsize(SaveBlock2_format))
-    save_block_2 = SaveBlock2._make(struct.unpack("<" + SaveBlock2_format, save_block_2_data))
-    save_block_2 = save_block_2._replace(pokedex=Pokedex._make(struct.unpack("<" + Pokedex_format, save_block_2.pokedex))._asdict())
+    save_block_2_data = gba.read_memory(save_block_2_ptr, SaveBlock2_struct.size)
+    save_block_2 = SaveBlock2._make(SaveBlock2_struct.unpack(save_block_2_data))
+    save_block_2 = save_block_2._replace(pokedex=Pokedex._make(Pokedex_struct.unpack(save_block_2.pokedex))._asdict())
     return save_block_2._asdict()
 
 def read_save_block_1(gba, parse_items: bool = False):
@@ -459,74 +548,144 @@ def read_save_block_1(gba, parse_items: bool = False):
     if save_block_1_ptr == 0:
         return None
 
-    save_block_1_data = gba.read_memory(save_block_1_ptr, struct.calcsize(SaveBlock1_format))
-    save_block_1 = SaveBlock1._make(struct.unpack("<" + SaveBlock1_format, save_block_1_data))
+    save_block_1_data = gba.read_memory(save_block_1_ptr, SaveBlock1_struct.size)
+    save_block_1 = SaveBlock1._make(SaveBlock1_struct.unpack(save_block_1_data))
     
     player_party_count = gba.read_u8(ADRESSES["gPlayerPartyCount"])
-    player_party_data = gba.read_memory(ADRESSES["gPlayerParty"], player_party_count * struct.calcsize(Pokemon_format))
+    player_party_data = gba.read_memory(ADRESSES["gPlayerParty"], player_party_count * Pokemon_struct.size)
 
     # parse nested structs
     save_block_1 = save_block_1._replace(
-        pos=Coords16._make(struct.unpack("<" + Coords16_format, save_block_1.pos))._asdict(),
-        location=WarpData._make(struct.unpack("<" + WarpData_format, save_block_1.location))._asdict(),
-        continueGameWarp=WarpData._make(struct.unpack("<" + WarpData_format, save_block_1.continueGameWarp))._asdict(),
-        dynamicWarp=WarpData._make(struct.unpack("<" + WarpData_format, save_block_1.dynamicWarp))._asdict(),
-        lastHealLocation=WarpData._make(struct.unpack("<" + WarpData_format, save_block_1.lastHealLocation))._asdict(),
-        escapeWarp=WarpData._make(struct.unpack("<" + WarpData_format, save_block_1.escapeWarp))._asdict(),
+        pos=Coords16._make(Coords16_struct.unpack(save_block_1.pos))._asdict(),
+        location=WarpData._make(WarpData_struct.unpack(save_block_1.location))._asdict(),
+        continueGameWarp=WarpData._make(WarpData_struct.unpack(save_block_1.continueGameWarp))._asdict(),
+        dynamicWarp=WarpData._make(WarpData_struct.unpack(save_block_1.dynamicWarp))._asdict(),
+        lastHealLocation=WarpData._make(WarpData_struct.unpack(save_block_1.lastHealLocation))._asdict(),
+        escapeWarp=WarpData._make(WarpData_struct.unpack(save_block_1.escapeWarp))._asdict(),
         playerParty=[
-            parse_pokemon(player_party_data[i:i+struct.calcsize(Pokemon_format)])
-            for i in range(0, player_party_count * struct.calcsize(Pokemon_format), struct.calcsize(Pokemon_format))
+            parse_pokemon(player_party_data[i:i + Pokemon_struct.size])
+            for i in range(0, len(player_party_data), Pokemon_struct.size)
         ],
     )
     if parse_items:
         save_block_1 = save_block_1._replace(
-            pcItems=[
-                ItemSlot._make(struct.unpack("<" + ItemSlot_format, save_block_1.pcItems[i:i+struct.calcsize(ItemSlot_format)]))._asdict()
-                for i in range(0, len(save_block_1.pcItems), struct.calcsize(ItemSlot_format))
-            ],
-            bagPocket_Items=[
-                ItemSlot._make(struct.unpack("<" + ItemSlot_format, save_block_1.bagPocket_Items[i:i+struct.calcsize(ItemSlot_format)]))._asdict()
-                for i in range(0, len(save_block_1.bagPocket_Items), struct.calcsize(ItemSlot_format))
-            ],
-            bagPocket_KeyItems=[
-                ItemSlot._make(struct.unpack("<" + ItemSlot_format, save_block_1.bagPocket_KeyItems[i:i+struct.calcsize(ItemSlot_format)]))._asdict()
-                for i in range(0, len(save_block_1.bagPocket_KeyItems), struct.calcsize(ItemSlot_format))
-            ],
-            bagPocket_PokeBalls=[
-                ItemSlot._make(struct.unpack("<" + ItemSlot_format, save_block_1.bagPocket_PokeBalls[i:i+struct.calcsize(ItemSlot_format)]))._asdict()
-                for i in range(0, len(save_block_1.bagPocket_PokeBalls), struct.calcsize(ItemSlot_format))
-            ],
-            bagPocket_TMHM=[
-                ItemSlot._make(struct.unpack("<" + ItemSlot_format, save_block_1.bagPocket_TMHM[i:i+struct.calcsize(ItemSlot_format)]))._asdict()
-                for i in range(0, len(save_block_1.bagPocket_TMHM), struct.calcsize(ItemSlot_format))
-            ],
-            bagPocket_Berries=[
-                ItemSlot._make(struct.unpack("<" + ItemSlot_format, save_block_1.bagPocket_Berries[i:i+struct.calcsize(ItemSlot_format)]))._asdict()
-                for i in range(0, len(save_block_1.bagPocket_Berries), struct.calcsize(ItemSlot_format))
-            ]
+            pcItems=_parse_item_slots(save_block_1.pcItems),
+            bagPocket_Items=_parse_item_slots(save_block_1.bagPocket_Items),
+            bagPocket_KeyItems=_parse_item_slots(save_block_1.bagPocket_KeyItems),
+            bagPocket_PokeBalls=_parse_item_slots(save_block_1.bagPocket_PokeBalls),
+            bagPocket_TMHM=_parse_item_slots(save_block_1.bagPocket_TMHM),
+            bagPocket_Berries=_parse_item_slots(save_block_1.bagPocket_Berries),
         )
 
     return save_block_1._asdict()
 
 
+def decode_box_pokemon(data, fields=None) -> dict[str, np.ndarray]:
+    """
+    Decrypts and decodes many BoxPokemon at once. `data` is either raw bytes of consecutive
+    BoxPokemon or an array of `BoxPokemon_dtype` records. Returns one array per field, with
+    nicknames and OT names left as raw bytes, and a `present` mask that is False for empty slots.
+    If `fields` is given, only those columns are decoded.
+    """
+    if isinstance(data, np.ndarray) and data.dtype == BoxPokemon_dtype:
+        boxes = data.reshape(-1)
+    else:
+        boxes = np.frombuffer(data, dtype=BoxPokemon_dtype)
+    personality = boxes["personality"]
+    key = personality ^ boxes["otId"]
+
+    # decrypt and reorder the substructs by personality mod 24
+    words = (boxes["substructs"] ^ key[:, None]).reshape(-1, 3)
+    perm = np.take(_substruct_selector_array, personality % 24, axis=0)
+    rows = perm + np.arange(0, 4 * len(boxes), 4)[:, None]
+    ordered = np.take(words, rows, axis=0)
+    # (substruct, word, mon) layout, so that every word is a contiguous column
+    s0, s1, s2, s3 = np.ascontiguousarray(ordered.transpose(1, 2, 0))
+    x1, x2, x3 = s3
+
+    columns = {
+        "present": lambda: personality != 0,
+        "personality": lambda: personality,
+        "otId": lambda: boxes["otId"],
+        "nickname": lambda: boxes["nickname"],
+        "language": lambda: boxes["language"],
+        "flags": lambda: boxes["flags"],
+        "otName": lambda: boxes["otName"],
+        "markings": lambda: boxes["markings"],
+        "checksum": lambda: boxes["checksum"],
+        "species": lambda: s0[0] & 0xFFFF,
+        "heldItem": lambda: s0[0] >> 16,
+        "experience": lambda: s0[1],
+        "ppBonuses": lambda: s0[2] & 0xFF,
+        "friendship": lambda: (s0[2] >> 8) & 0xFF,
+        "moves": lambda: np.stack([s1[0] & 0xFFFF, s1[0] >> 16, s1[1] & 0xFFFF, s1[1] >> 16], axis=1),
+        "pp": lambda: np.stack([(s1[2] >> shift) & 0xFF for shift in (0, 8, 16, 24)], axis=1),
+        "pokerus": lambda: x1 & 0xFF,
+        "metLocation": lambda: (x1 >> 8) & 0xFFFF,
+        "metLevel": lambda: (x1 >> 16) & 0b01111111,
+        "metGame": lambda: (x1 >> 23) & 0xF,
+        "pokeball": lambda: (x1 >> 27) & 0xF,
+        "otGender": lambda: (x1 >> 31) & 0b1,
+        "hpIV": lambda: x2 & 0b00011111,
+        "attackIV": lambda: (x2 >> 5) & 0b00011111,
+        "defenseIV": lambda: (x2 >> 10) & 0b00011111,
+        "speedIV": lambda: (x2 >> 15) & 0b00011111,
+        "spAttackIV": lambda: (x2 >> 20) & 0b00011111,
+        "spDefenseIV": lambda: (x2 >> 25) & 0b00011111,
+        "isEgg": lambda: (x2 >> 30) & 0b1,
+        "abilityNum": lambda: (x2 >> 31) & 0b1,
+        "ribbons": lambda: x3,
+    }
+    # substruct 2 is 12 single byte fields
+    for i, (name, _) in enumerate(PokemonSubstruct2_spec):
+        columns[name] = lambda i=i: (s2[i // 4] >> (8 * (i % 4))) & 0xFF
+
+    if fields is None:
+        fields = columns.keys()
+    return {name: columns[name]() for name in fields}
+
+def box_pokemon_dicts(columns) -> list:
+    """
+    Converts decoded columns back into the dicts returned by `parse_box_pokemon`.
+    """
+    lists = {name: column.tolist() for name, column in columns.items()}
+    substruct0_fields = [name for name, _ in PokemonSubstruct0_spec if name != "unknown"]
+    substruct2_fields = [name for name, _ in PokemonSubstruct2_spec]
+    mons = []
+    for i, present in enumerate(lists["present"]):
+        if not present:
+            mons.append(None)
+            continue
+        mons.append({
+            "personality": lists["personality"][i],
+            "otId": lists["otId"][i],
+            "nickname": emerald_charmap.decode(bytes(lists["nickname"][i])),
+            "language": lists["language"][i],
+            "flags": lists["flags"][i],
+            "otName": emerald_charmap.decode(bytes(lists["otName"][i])),
+            "markings": lists["markings"][i],
+            "checksum": lists["checksum"][i],
+            "substructs": (
+                {name: lists[name][i] for name in substruct0_fields},
+                {"moves": lists["moves"][i], "pp": lists["pp"][i]},
+                {name: lists[name][i] for name in substruct2_fields},
+                {name: lists[name][i] for name in PokemonSubstruct3._fields},
+            ),
+        })
+    return mons
+
+
 def read_pokemon_storage(gba):
     pokemon_storage_ptr = gba.read_u32(ADRESSES["gPokemonStoragePtr"])
     if pokemon_storage_ptr == 0:
         return None
 
-    pokemon_storage_data = gba.read_memory(pokemon_storage_ptr, struct.calcsize(PokemonStorage_format))
-    pokemon_storage = PokemonStorage._make(struct.unpack("<" + PokemonStorage_format, pokemon_storage_data))
+    pokemon_storage_data = gba.read_memory(pokemon_storage_ptr, PokemonStorage_struct.size)
+    pokemon_storage = PokemonStorage._make(PokemonStorage_struct.unpack(pokemon_storage_data))
     
-    box_mon_size = struct.calcsize(BoxPokemon_format)
-    box_size = box_mon_size * IN_BOX_COUNT
-    parsed_boxes = []
-    for j in range(TOTAL_BOXES_COUNT):
-        parsed_boxes.append([
-            parse_box_pokemon(pokemon_storage.boxes[i:i+box_mon_size])
-            for i in range(j * box_size, (j + 1) * box_size, box_mon_size)
-        ])
+    mons = box_pokemon_dicts(decode_box_pokemon(pokemon_storage.boxes))
     pokemon_storage = pokemon_storage._replace(
-        boxes=parsed_boxes,
+        boxes=[mons[i:i + IN_BOX_COUNT] for i in range(0, len(mons), IN_BOX_COUNT)],
         boxNames=[
             pokemon_storage.boxNames[i:i+BOX_NAME_LENGTH]
             for i in range(0, len(pokemon_storage.boxNames), BOX_NAME_LENGTH + 1)
@@ -534,7 +693,59 @@ def read_pokemon_storage(gba):
     )
     return pokemon_storage._asdict()
 
-@functools.lru_cache(maxsize=1)
+def read_pokemon_storage_columns(gba, fields=None):
+    """
+    Decodes all PC box slots in one batch, see `decode_box_pokemon`. Slots are in box-major order.
+    """
+    pokemon_storage = read_pokemon_storage_record(gba)
+    if pokemon_storage is None:
+        return None
+    return decode_box_pokemon(pokemon_storage["boxes"], fields)
+
+
+def _read_record(gba, ptr_name, dtype):
+    ptr = gba.read_u32(ADRESSES[ptr_name])
+    if ptr == 0:
+        return None
+    return np.frombuffer(gba.read_memory(ptr, dtype.itemsize), dtype=dtype)[0]
+
+def read_save_block_1_record(gba):
+    """
+    Record view of save block 1 (see `SaveBlock1_dtype`), e.g. `record["playerParty"]["box"]["otId"]`.
+    Unlike `read_save_block_1`, nothing is decoded and the party is the one stored in the save block.
+    """
+    return _read_record(gba, "gSaveBlock1Ptr", SaveBlock1_dtype)
+
+def read_save_block_2_record(gba):
+    return _read_record(gba, "gSaveBlock2Ptr", SaveBlock2_dtype)
+
+def read_pokemon_storage_record(gba):
+    return _read_record(gba, "gPokemonStoragePtr", PokemonStorage_dtype)
+
+def read_party_records(gba):
+    player_party_count = gba.read_u8(ADRESSES["gPlayerPartyCount"])
+    player_party_data = gba.read_memory(ADRESSES["gPlayerParty"], player_party_count * Pokemon_dtype.itemsize)
+    return np.frombuffer(player_party_data, dtype=Pokemon_dtype)
+
+def _cache_per_rom(fn):
+    """
+    Caches the result of `fn(gba)` by `gba.rom_digest`, so that all instances running the same
+    ROM share it.
+    """
+    cache = {}
+
+    @functools.wraps(fn)
+    def wrapper(gba):
+        key = gba.rom_digest
+        if key not in cache:
+            cache[key] = fn(gba)
+        return cache[key]
+
+    wrapper.cache_clear = cache.clear
+    return wrapper
+
+
+@_cache_per_rom
 def read_species_names(gba):
     species_names_ptr = ADRESSES["gSpeciesNames"]
     if species_names_ptr == 0:
@@ -542,25 +753,38 @@ def read_species_names(gba):
 
     species_names_data = gba.read_memory(species_names_ptr, NUM_SPECIES * (POKEMON_NAME_LENGTH +1))
     species_names = [
-        EmeraldCharmap().decode(species_names_data[i:i+POKEMON_NAME_LENGTH+1])
+        emerald_charmap.decode(species_names_data[i:i+POKEMON_NAME_LENGTH+1])
         for i in range(0, len(species_names_data), POKEMON_NAME_LENGTH+1)
     ]
     return species_names
 
-@functools.lru_cache(maxsize=1)
+@_cache_per_rom
+def read_pokedex_table(gba):
+    """
+    Lowercase names of the species 1 to NUM_SPECIES - 1 and the index of their bit in the
+    little-endian bits of `Pokedex.seen` and `Pokedex.owned`.
+    """
+    species_names = read_species_names(gba)
+    if species_names is None:
+        return None
+
+    dex_numbers = gba.read_array(ADRESSES["sSpeciesToNationalPokedexNum"], NUM_SPECIES - 1, np.uint16)
+    # species without a dex number wrap around to the last bit
+    bits = dex_numbers.astype(np.int64) - 1
+    bits[bits < 0] += 8 * NUM_DEX_FLAG_BYTES
+    return tuple(name.lower() for name in species_names[1:]), bits
+
+@_cache_per_rom
 def read_species_info(gba):
     species_info_ptr = ADRESSES["gSpeciesInfo"]
     if species_info_ptr == 0:
         return None
 
-    species_info_data = gba.read_memory(species_info_ptr, NUM_SPECIES * struct.calcsize(SpeciesInfo_format))
-    species_info = [
-        SpeciesInfo._make(struct.unpack("<" + SpeciesInfo_format, species_info_data[i:i+struct.calcsize(SpeciesInfo_format)]))
-        for i in range(0, len(species_info_data), struct.calcsize(SpeciesInfo_format))
-    ]
+    species_info_data = gba.read_memory(species_info_ptr, NUM_SPECIES * SpeciesInfo_struct.size)
+    species_info = [SpeciesInfo._make(info) for info in SpeciesInfo_struct.iter_unpack(species_info_data)]
     return species_info
 
-@functools.lru_cache(maxsize=1)
+@_cache_per_rom
 def read_experience_tables(gba):
     exp_table_ptr = ADRESSES["gExperienceTables"]
     if exp_table_ptr == 0:
@@ -575,3 +799,19 @@ def read_experience_tables(gba):
     for i in range(0, len(exp_table_flat), 101):
         exp_tables.append(exp_table_flat[i:i+101])
     return exp_tables
+
+@_cache_per_rom
+def read_experience_table_array(gba):
+    exp_tables = read_experience_tables(gba)
+    if exp_tables is None:
+        return None
+    return np.array(exp_tables, dtype=np.int64)
+
+@_cache_per_rom
+def read_growth_rates(gba):
+    species_info_ptr = ADRESSES["gSpeciesInfo"]
+    if species_info_ptr == 0:
+        return None
+
+    species_info_data = gba.read_memory(species_info_ptr, NUM_SPECIES * SpeciesInfo_dtype.itemsize)
+    return np.frombuffer(species_info_data, dtype=SpeciesInfo_dtype)["growthRate"].copy()
@@ -1,13 +1,17 @@
 import sys
-from typing import Any, Literal
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Literal, Sequence
 
 import gymnasium as gym
 import mgba.core
 import mgba.image
 import numpy as np
+from mgba._pylib import ffi
 
 from .utils import KEY_MAP
 from .pygba import PyGBA
+from .profiling import StepProfiler
+from .recorder import EpisodeRecorder
 from .game_wrappers.base import GameWrapper
 
 
@@ -20,6 +24,23 @@ except ImportError as e:
 def _pil_image_to_pygame(img):
     return pygame.image.fromstring(img.tobytes(), img.size, img.mode).convert()
 
+def _framebuffer_to_array(image: mgba.image.Image) -> np.ndarray:
+    # zero-copy (height, width, 4) view over the RGBX pixels of an mGBA image
+    pixels = np.frombuffer(ffi.buffer(image.buffer), dtype=np.uint8)
+    return pixels.reshape(image.height, image.stride, 4)[:, :image.width]
+
+def _rgb_to_grayscale(rgb: np.ndarray, out: np.ndarray, tmp: np.ndarray):
+    # same fixed-point ITU-R 601-2 luma transform as PIL's `convert("L")`
+    np.multiply(rgb[..., 0], np.uint32(19595), out=tmp)
+    tmp += rgb[..., 1] * np.uint32(38470)
+    tmp += rgb[..., 2] * np.uint32(7471)
+    tmp += np.uint32(0x8000)
+    tmp >>= 16
+    np.copyto(out, tmp, casting="unsafe")
+
+# (address, size) slices of EWRAM and IWRAM
+DEFAULT_RAM_SLICES = ((0x02000000, 0x40000), (0x03000000, 0x8000))
+
 class PyGBAEnv(gym.Env):
 
     metadata = {
@@ -31,12 +52,25 @@ class PyGBAEnv(gym.Env):
         self,
         gba: PyGBA,
         game_wrapper: GameWrapper | None = None,
-        obs_type: Literal["rgb", "grayscale"] = "rgb",
+        obs_type: Literal["rgb", "grayscale", "ram", "dict"] = "rgb",
         frameskip: int | tuple[int, int] | tuple[int, int, int] = 0,
         repeat_action_probability: float = 0.0,
         render_mode: Literal["human", "rgb_array"] | None = None,
         reset_to_initial_state: bool = True,
         max_episode_steps: int | None = None,
+        headless: bool = False,
+        copy_observation: bool = True,
+        frame_stack: int = 1,
+        max_pool_last: int = 1,
+        crop: tuple[int, int, int, int] | None = None,
+        downscale: int = 1,
+        downscale_mode: Literal["area", "nearest"] = "area",
+        channels: tuple[int, ...] | None = None,
+        screen_type: Literal["rgb", "grayscale"] = "rgb",
+        ram_slices: Sequence[tuple[int | Callable[[PyGBA], int], int]] | None = None,
+        recorder: EpisodeRecorder | None = None,
+        profile: bool = False,
+        profile_info: bool = False,
         **kwargs,
     ):
         self.gba = gba
@@ -52,11 +86,74 @@ class PyGBAEnv(gym.Env):
                 "which means that there is no reward calculation and no game over detection."
             )
         
+        # "ram" observations are slices of memory, "dict" observations are the screen
+        # (in `screen_type` format) under "screen" and the memory slices under "ram"
+        if obs_type not in ("rgb", "grayscale", "ram", "dict"):
+            raise ValueError(f"Invalid obs_type: {obs_type}")
+        if screen_type not in ("rgb", "grayscale"):
+            raise ValueError(f"Invalid screen_type: {screen_type}")
+        if obs_type == "dict" and headless:
+            raise ValueError("dict observations are not available in headless mode")
         self.obs_type = obs_type
+        self.screen_type = {"ram": None, "dict": screen_type}.get(obs_type, obs_type)
         self.frameskip = frameskip
         self.repeat_action_probability = repeat_action_probability
         self.render_mode = render_mode
         self.max_episode_steps = max_episode_steps
+        # in headless mode, no video buffer is attached and mGBA doesn't render at all,
+        # the game state can only be observed through memory (e.g. via the game wrapper)
+        self.headless = headless
+        self._has_screen = not headless and self.screen_type is not None
+        # if False, observations are written to a preallocated array that is reused by the next step
+        self.copy_observation = copy_observation
+        # observations are the last `frame_stack` frames, each the pixel-wise maximum over the
+        # last `max_pool_last` emulated frames of its step (to remove sprite flickering)
+        if frame_stack < 1 or max_pool_last < 1:
+            raise ValueError("frame_stack and max_pool_last must be at least 1")
+        if not self._has_screen and (frame_stack > 1 or max_pool_last > 1):
+            raise ValueError("Frame stacking and max pooling are only available for screen observations")
+        self.frame_stack = frame_stack
+        self.max_pool_last = max_pool_last
+        # the screen of every step of sampled episodes is streamed to the recorder
+        if headless and recorder is not None:
+            raise ValueError("Recording is not available in headless mode")
+        self.recorder = None
+        self._recording: int | None = None
+        # per-phase timings of every step, `profile_info` also adds the timings of the step to `info`
+        self._profiler = StepProfiler() if profile or profile_info else None
+        self.profile_info = profile_info
+
+        # observations are cropped to the `(left, top, right, bottom)` box of the screen, then
+        # downscaled by an integer factor, and only the selected RGB channels are kept
+        screen_width, screen_height = self.gba.core.desired_video_dimensions()
+        if crop is None:
+            crop = (0, 0, screen_width, screen_height)
+        left, top, right, bottom = crop
+        if not (0 <= left < right <= screen_width and 0 <= top < bottom <= screen_height):
+            raise ValueError(f"Invalid crop box {crop} for a screen of size {(screen_width, screen_height)}")
+        if downscale < 1 or downscale > min(right - left, bottom - top):
+            raise ValueError(f"Invalid downscale factor: {downscale}")
+        if downscale_mode not in ("area", "nearest"):
+            raise ValueError(f"Invalid downscale mode: {downscale_mode}")
+        if channels is not None and (self.screen_type != "rgb" or not set(channels) <= {0, 1, 2}):
+            raise ValueError(f"Invalid channels {channels} for obs_type {obs_type}")
+        self.crop = crop
+        self.downscale = downscale
+        self.downscale_mode = downscale_mode
+        self.channels = tuple(channels) if channels is not None else (0, 1, 2)
+        width, height = (right - left) // downscale, (bottom - top) // downscale
+
+        # the address of a RAM slice can also be a function of the PyGBA object,
+        # for data that moves around in memory (e.g. save blocks behind a pointer)
+        self.ram_slices = list(ram_slices) if ram_slices is not None else list(DEFAULT_RAM_SLICES)
+        self._ram_views = []
+        if obs_type in ("ram", "dict"):
+            for address, size in self.ram_slices:
+                if size <= 0:
+                    raise ValueError(f"Invalid RAM slice size: {size}")
+                view = None if callable(address) else self._ram_view(address, size)
+                self._ram_views.append((address, size, view))
+        ram_size = sum(size for _, size in self.ram_slices)
 
         self.arrow_keys = [None, "up", "down", "right", "left"]
         self.buttons = [None, "A", "B", "select", "start", "L", "R"]
@@ -67,13 +164,55 @@ class PyGBAEnv(gym.Env):
         self.action_space = gym.spaces.Discrete(len(self.actions))
 
         # Building the observation_space
-        screen_size = self.gba.core.desired_video_dimensions()
-        if obs_type == "rgb":
-            screen_size += (3,)
-        self.observation_space = gym.spaces.Box(low=0, high=255, shape=screen_size, dtype=np.uint8)
+        if self._has_screen:
+            screen_size = (width, height)
+            if self.screen_type == "rgb":
+                screen_size += (len(self.channels),)
+            if frame_stack > 1:
+                screen_size = (frame_stack,) + screen_size
+        else:
+            screen_size = (0,)
+        screen_space = gym.spaces.Box(low=0, high=255, shape=screen_size, dtype=np.uint8)
+        ram_space = gym.spaces.Box(low=0, high=255, shape=(ram_size,), dtype=np.uint8)
+        if obs_type == "ram":
+            self.observation_space = ram_space
+        elif obs_type == "dict":
+            self.observation_space = gym.spaces.Dict({"screen": screen_space, "ram": ram_space})
+        else:
+            self.observation_space = screen_space
 
-        self._framebuffer = mgba.image.Image(*self.gba.core.desired_video_dimensions())
-        self.gba.core.set_video_buffer(self._framebuffer)  # need to reset after this
+        if headless:
+            self._framebuffer = None
+            self._framebuffer_pixels = None
+            self._screen_pixels = None
+        else:
+            self._framebuffer = mgba.image.Image(*self.gba.core.desired_video_dimensions())
+            self.gba.core.set_video_buffer(self._framebuffer)  # need to reset after this
+            self._framebuffer_pixels = _framebuffer_to_array(self._framebuffer)
+            self._screen_pixels = self._framebuffer_pixels[
+                top:top + height * downscale, left:left + width * downscale
+            ]
+
+        if not self._has_screen:
+            # memory slices of "ram" observations, nothing in headless mode
+            self._obs_buffer = np.zeros(self.observation_space.shape, dtype=np.uint8)
+        else:
+            # the buffers are (height, width, ...), observations are transposed views of them
+            frame_shape = (height, width) + ((len(self.channels),) if self.screen_type == "rgb" else ())
+            self._obs_buffer = np.zeros(frame_shape, dtype=np.uint8)
+            if downscale > 1 and downscale_mode == "area":
+                self._area_buffer = np.empty((height, width, 3), dtype=np.uint32)
+            if self.screen_type == "grayscale":
+                self._gray_buffer = np.empty(frame_shape, dtype=np.uint32)
+            if max_pool_last > 1:
+                self._pool_buffer = np.zeros((max_pool_last,) + frame_shape, dtype=np.uint8)
+            if frame_stack > 1:
+                # every frame is written twice, so that the last `frame_stack` frames
+                # are always a contiguous slice of the ring buffer
+                self._stack_buffer = np.zeros((2 * frame_stack,) + frame_shape, dtype=np.uint8)
+                self._stack_index = 0
+        if obs_type == "dict":
+            self._ram_buffer = np.zeros(ram_size, dtype=np.uint8)
 
         self._screen = None
         self._clock = None
@@ -81,12 +220,26 @@ class PyGBAEnv(gym.Env):
         self._step = 0
         if reset_to_initial_state:
             self._initial_state = self.gba.core.save_raw_state()
-            pass
         else:
             self._initial_state = None
         self._kwargs = kwargs
+        self._pending_step: Future | None = None
+        # created by the first `step_async`, mGBA releases the GIL while emulating
+        # so the cores of different environments run concurrently
+        self._step_executor: ThreadPoolExecutor | None = None
+
+        # (state, framebuffer) snapshots that `reset` restores without resetting the core
+        self._reset_states: list[tuple[bytes, np.ndarray | None]] = []
+        # a full core reset is only needed once, to hook up the video buffer
+        self.gba.core.reset()
+        if self._initial_state is not None:
+            self.gba.load_state(self._initial_state)
+            self._render_current_state()
+            self._reset_states.append(self._snapshot())
 
         self.reset()
+        # episodes start with the first reset by the caller
+        self.recorder = recorder
 
     def get_action_by_id(self, action_id: int) -> tuple[Any, Any]:
         if action_id < 0 or action_id > len(self.actions):
@@ -99,14 +252,116 @@ class PyGBAEnv(gym.Env):
             raise ValueError(f"Invalid action: Must be a tuple of (arrow, button)")
         return self.actions.index(action)
 
+    def _observation_view(self, buffer: np.ndarray) -> np.ndarray:
+        # maps (..., height, width[, channels]) buffers to (..., width, height[, channels]) observations
+        if not self._has_screen:
+            return buffer
+        height_axis = buffer.ndim - (3 if self.screen_type == "rgb" else 2)
+        return buffer.swapaxes(height_axis, height_axis + 1)
+
+    def _capture_frame(self, out: np.ndarray):
+        pixels = self._screen_pixels
+        f = self.downscale
+        if f > 1:
+            if self.downscale_mode == "nearest":
+                pixels = pixels[::f, ::f]
+            else:
+                # average over f x f blocks, rounded to the nearest integer
+                height, width = out.shape[:2]
+                blocks = pixels[..., :3].reshape(height, f, width, f, 3)
+                pixels = np.sum(blocks, axis=(1, 3), dtype=np.uint32, out=self._area_buffer)
+                pixels += np.uint32(f * f // 2)
+                pixels //= np.uint32(f * f)
+
+        if self.screen_type == "grayscale":
+            _rgb_to_grayscale(pixels, out, self._gray_buffer)
+        else:
+            # copying channel by channel is a lot faster than numpy's generic strided copy
+            for i, c in enumerate(self.channels):
+                np.copyto(out[..., i], pixels[..., c], casting="unsafe")
+
+    def _ram_view(self, address: int, size: int) -> np.ndarray:
+        view = self.gba.get_memory_view(address, size)
+        if len(view) != size:
+            raise ValueError(f"RAM slice of size {size} at {address:#x} is out of bounds")
+        return np.frombuffer(view, dtype=np.uint8)
+
+    def _read_ram(self, out: np.ndarray):
+        offset = 0
+        for address, size, view in self._ram_views:
+            if view is None:
+                view = self._ram_view(address(self.gba), size)
+            out[offset:offset + size] = view
+            offset += size
+
+    def _run_and_capture(self, frames: int):
+        if not self._has_screen:
+            self.gba.run_frames(frames)
+            return
+
+        pool = min(self.max_pool_last, frames)
+        if pool > 1:
+            self.gba.run_frames(frames - pool, render_last=False)
+            for i in range(pool):
+                self.gba.run_frames(1)
+                self._capture_frame(self._pool_buffer[i])
+            np.max(self._pool_buffer[:pool], axis=0, out=self._obs_buffer)
+        else:
+            self.gba.run_frames(frames)
+            self._capture_frame(self._obs_buffer)
+        self._push_frame()
+
+    def _push_frame(self, fill: bool = False):
+        if self.frame_stack == 1:
+            return
+        k = self.frame_stack
+        if fill:
+            self._stack_buffer[:] = self._obs_buffer
+            self._stack_index = 0
+        else:
+            self._stack_index = (self._stack_index + 1) % k
+            self._stack_buffer[self._stack_index] = self._obs_buffer
+            self._stack_buffer[self._stack_index + k] = self._obs_buffer
+
+    def _stack_window(self) -> np.ndarray:
+        # the last `frame_stack` frames in chronological order
+        return self._stack_buffer[self._stack_index + 1:self._stack_index + 1 + self.frame_stack]
+
     def _get_observation(self):
-        img = self._framebuffer.to_pil().convert("RGB")
-        if self.obs_type == "grayscale":
-            img = img.convert("L")
-        return np.array(img).transpose(1, 0, 2)
+        if self.obs_type == "ram":
+            self._read_ram(self._obs_buffer)
+        observation = self._stack_window() if self.frame_stack > 1 else self._obs_buffer
+        if self.copy_observation:
+            observation = observation.copy()
+        observation = self._observation_view(observation)
+        if self.obs_type == "dict":
+            self._read_ram(self._ram_buffer)
+            ram = self._ram_buffer.copy() if self.copy_observation else self._ram_buffer
+            observation = {"screen": observation, "ram": ram}
+        return observation
+
+    def _wrapper_observation(self, observation):
+        # game wrappers only get the screen, which there is none of for ram observations or in headless mode
+        if not self._has_screen:
+            return None
+        if self.obs_type == "dict":
+            return observation["screen"]
+        return observation
+
+    def get_profile(self) -> dict[str, dict]:
+        if self._profiler is None:
+            raise RuntimeError("Profiling is not enabled, pass `profile=True` to the environment")
+        return self._profiler.summary()
+
+    def reset_profile(self):
+        if self._profiler is not None:
+            self._profiler.reset()
 
     def step(self, action_id):
         info = {}
+        profiler = self._profiler
+        if profiler is not None:
+            profiler.start()
 
         actions = self.get_action_by_id(action_id)
         actions = [KEY_MAP[a] for a in actions if a is not None]
@@ -118,9 +373,14 @@ class PyGBAEnv(gym.Env):
         else:
             frameskip = self.frameskip
 
-        for _ in range(frameskip + 1):
-            self.gba.core.run_frame()
+        self._run_and_capture(frameskip + 1)
+        if profiler is not None:
+            profiler.lap("emulate")
         observation = self._get_observation()
+        if self._recording is not None:
+            self.recorder.add_frame(self._recording, self._framebuffer_pixels)
+        if profiler is not None:
+            profiler.lap("observation")
 
         reward = 0
         done = False
@@ -128,40 +388,117 @@ class PyGBAEnv(gym.Env):
         if self.max_episode_steps is not None:
             truncated = self._step >= self.max_episode_steps
         if self.game_wrapper is not None:
-            reward = self.game_wrapper.reward(self.gba, observation)
-            done = done or self.game_wrapper.game_over(self.gba, observation)
-            info.update(self.game_wrapper.info(self.gba, observation))
+            wrapper_obs = self._wrapper_observation(observation)
+            reward = self.game_wrapper.reward(self.gba, wrapper_obs)
+            if profiler is not None:
+                profiler.lap("reward")
+            done = done or self.game_wrapper.game_over(self.gba, wrapper_obs)
+            if profiler is not None:
+                profiler.lap("game_over")
+            info.update(self.game_wrapper.info(self.gba, wrapper_obs))
+            if profiler is not None:
+                profiler.lap("info")
 
         self._total_reward += reward
         self._step += 1
+        if (done or truncated) and self._recording is not None:
+            self.recorder.end_episode(self._recording)
+            self._recording = None
         # print(f"\r step={self._step} | {reward=} | {done=} | {truncated=}", end="", flush=True)
 
+        if self.profile_info:
+            info["profile"] = dict(profiler.last)
         return observation, reward, done, truncated, info
     
+    def step_async(self, action_id):
+        if self._pending_step is not None:
+            raise RuntimeError("Cannot call step_async while a previous step is still pending")
+        if self._step_executor is None:
+            self._step_executor = ThreadPoolExecutor(1, thread_name_prefix="pygba-step")
+        self._pending_step = self._step_executor.submit(self.step, action_id)
+
+    def step_wait(self):
+        if self._pending_step is None:
+            raise RuntimeError("Calling step_wait without a pending step_async")
+        future, self._pending_step = self._pending_step, None
+        return future.result()
+
     def check_if_done(self):
-        observation = self._get_observation()
+        observation = self._wrapper_observation(self._get_observation()) if self._has_screen else None
         done = self.game_wrapper.game_over(self.gba, observation)
 
         return done
 
-    def reset(self, seed=None):
+    def _render_current_state(self):
+        # savestates don't include the rendered frame, so one frame is emulated after loading one
+        # and the snapshot is taken after it (there is no rendered frame to refresh in headless mode)
+        if not self.headless:
+            self.gba.run_frames(1)
+
+    def _snapshot(self) -> tuple[bytes, np.ndarray | None]:
+        frame = None if self.headless else self._framebuffer_pixels.copy()
+        return self.gba.save_state(), frame
+
+    def _restore(self, snapshot: tuple[bytes, np.ndarray | None]):
+        state, frame = snapshot
+        if not self.gba.load_state(state):
+            raise RuntimeError("Failed to load a reset state")
+        if frame is not None:
+            np.copyto(self._framebuffer_pixels, frame)
+
+    def add_reset_state(self, state: bytes | None = None) -> int:
+        """
+        Adds a state to reset to and returns its index, either the current state of the emulator
+        or the given raw savestate. `reset` picks one of the reset states at random, unless an
+        index is passed as `options={"reset_state": index}`.
+        """
+        if state is None:
+            snapshot = self._snapshot()
+        else:
+            current = self._snapshot()
+            if not self.gba.load_state(state):
+                raise ValueError("Invalid savestate")
+            self._render_current_state()
+            snapshot = self._snapshot()
+            self._restore(current)
+        self._reset_states.append(snapshot)
+        return len(self._reset_states) - 1
+
+    def clear_reset_states(self):
+        # without reset states, `reset` resets the core instead
+        self._reset_states.clear()
+
+    def reset(self, seed=None, options=None):
+        super().reset(seed=seed)
+        if self._profiler is not None:
+            self._profiler.start()
         info = {}
         self._total_reward = 0
         self._step = 0
-        self.gba.core.reset()
-        if self._initial_state is not None:
-            self.gba.core.load_raw_state(self._initial_state)
+        if self._reset_states:
+            index = (options or {}).get("reset_state")
+            if index is None:
+                index = int(self.np_random.integers(len(self._reset_states))) if len(self._reset_states) > 1 else 0
+            self._restore(self._reset_states[index])
+        else:
+            self.gba.core.reset()
 
-            # not sure what the best solution is here:
-            # 1. don't run_frame after resetting the state, will lead to the old frame still being rendered
-            # 2. run_frame after resetting the state, offsetting the savestate by one frame
-            self.gba.core.run_frame()
-        
+        if self._has_screen:
+            self._capture_frame(self._obs_buffer)
+            self._push_frame(fill=True)
         observation = self._get_observation()
+        if self.recorder is not None:
+            if self._recording is not None:
+                self.recorder.end_episode(self._recording)
+            self._recording = self.recorder.start_episode()
+            if self._recording is not None:
+                self.recorder.add_frame(self._recording, self._framebuffer_pixels)
         
         if self.game_wrapper is not None:
             self.game_wrapper.reset(self.gba)
-            info.update(self.game_wrapper.info(self.gba, observation))
+            info.update(self.game_wrapper.info(self.gba, self._wrapper_observation(observation)))
+        if self._profiler is not None:
+            self._profiler.lap("reset")
         return observation, info
 
     def render(self):
@@ -171,9 +508,12 @@ class PyGBAEnv(gym.Env):
                 "You can specify the render_mode at initialization."
             )
             return
+        if self.headless:
+            gym.logger.warn("Cannot render a headless environment.")
+            return
         
         img = self._framebuffer.to_pil().convert("RGB")
-        if self.obs_type == "grayscale":
+        if self.screen_type == "grayscale":
             img = img.convert("L")
         
         if self.render_mode == "human":
@@ -210,7 +550,19 @@ class PyGBAEnv(gym.Env):
             return np.array(img)
 
     def close(self):
+        # a pending step must not run on a core that is being torn down
+        if self._pending_step is not None:
+            wait([self._pending_step])
+            self._pending_step = None
+        if self._step_executor is not None:
+            self._step_executor.shutdown()
+            self._step_executor = None
+        if self._recording is not None:
+            self.recorder.end_episode(self._recording)
+            self._recording = None
         if self._screen is not None:
             if "pygame" not in sys.modules:
                 pygame.display.quit()
                 pygame.quit()
+        # removes the temporary files of `PyGBA.load`
+        self.gba.close()
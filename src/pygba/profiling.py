@@ -0,0 +1,123 @@
+from time import perf_counter_ns
+
+import numpy as np
+
+
+# bucket i counts durations in [2^(i-1), 2^i) nanoseconds
+NUM_BUCKETS = 64
+
+# timestamps are buffered and folded into the histograms in batches
+_FLUSH_EVERY = 1 << 14
+
+
+class PhaseStats:
+    """
+    Running statistics of the durations of one phase, with a log2 histogram instead of raw samples.
+    """
+
+    __slots__ = ("count", "total_ns", "min_ns", "max_ns", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+        self.buckets = np.zeros(NUM_BUCKETS, dtype=np.int64)
+
+    def add(self, samples):
+        samples = np.asarray(samples, dtype=np.int64)
+        if len(samples) == 0:
+            return
+        self.count += len(samples)
+        self.total_ns += int(samples.sum())
+        low, high = int(samples.min()), int(samples.max())
+        self.min_ns = low if self.min_ns is None else min(self.min_ns, low)
+        self.max_ns = max(self.max_ns, high)
+        # the exponent of frexp is the bit length of the duration
+        _, bits = np.frexp(samples.astype(np.float64))
+        self.buckets += np.bincount(np.minimum(bits, NUM_BUCKETS - 1), minlength=NUM_BUCKETS)
+
+    def percentile(self, q: float) -> int:
+        # upper bound of the bucket that contains the q-th percentile
+        if self.count == 0:
+            return 0
+        bucket = int(np.searchsorted(np.cumsum(self.buckets), q / 100 * self.count))
+        return min(1 << min(bucket, NUM_BUCKETS - 1), self.max_ns)
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ms": self.total_ns / 1e6,
+            "mean_us": self.total_ns / self.count / 1e3 if self.count else 0.0,
+            "min_us": (self.min_ns or 0) / 1e3,
+            "max_us": self.max_ns / 1e3,
+            "p50_us": self.percentile(50) / 1e3,
+            "p90_us": self.percentile(90) / 1e3,
+            "p99_us": self.percentile(99) / 1e3,
+            "histogram": {1 << i: int(count) for i, count in enumerate(self.buckets) if count},
+        }
+
+
+class StepProfiler:
+    """
+    Times consecutive phases of a step: `start` sets a mark and every `lap` attributes the time
+    since the previous mark to a phase. Laps only record a timestamp, durations are computed and
+    aggregated in batches.
+    """
+
+    def __init__(self):
+        self.phases: dict[str, PhaseStats] = {}
+        # the phase that ended at each timestamp, None starts a new step
+        self._mark_phases: list[str | None] = []
+        self._mark_times: list[int] = []
+        self._step_start = 0
+        # index of the last mark whose duration has been aggregated
+        self._flushed = 0
+
+    def start(self):
+        if len(self._mark_times) >= _FLUSH_EVERY:
+            self._flush()
+        self._step_start = len(self._mark_times)
+        self._mark_phases.append(None)
+        self._mark_times.append(perf_counter_ns())
+
+    def lap(self, phase: str):
+        self._mark_phases.append(phase)
+        self._mark_times.append(perf_counter_ns())
+
+    @property
+    def last(self) -> dict[str, int]:
+        # durations of the phases of the current step
+        phases = self._mark_phases[self._step_start + 1:]
+        times = self._mark_times[self._step_start:]
+        return {phase: t - prev_t for phase, prev_t, t in zip(phases, times, times[1:])}
+
+    def _flush(self):
+        # aggregates the marks that weren't yet, the marks of the current step are kept for `last`
+        # as the step may still be running
+        end = len(self._mark_times)
+        if end - self._flushed > 1:
+            phases = np.array(self._mark_phases[self._flushed + 1:end], dtype=object)
+            durations = np.diff(np.array(self._mark_times[self._flushed:end], dtype=np.int64))
+            for phase in set(phases.tolist()):
+                if phase is None:
+                    continue
+                if phase not in self.phases:
+                    self.phases[phase] = PhaseStats()
+                self.phases[phase].add(durations[phases == phase])
+            self._flushed = end - 1
+        del self._mark_phases[:self._step_start]
+        del self._mark_times[:self._step_start]
+        self._flushed -= self._step_start
+        self._step_start = 0
+
+    def summary(self) -> dict[str, dict]:
+        self._flush()
+        return {phase: stats.summary() for phase, stats in self.phases.items()}
+
+    def reset(self):
+        self.phases = {}
+        self._mark_phases = []
+        self._mark_times = []
+        self._step_start = 0
+        self._flushed = 0
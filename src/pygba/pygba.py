@@ -1,44 +1,259 @@
+import hashlib
+import os
+import shutil
 import tempfile
+import weakref
 from pathlib import Path
+from typing import Any, Callable, Iterable
 
 import mgba.core
+import numpy as np
 from mgba._pylib import ffi, lib
 
-from pygba.utils import KEY_MAP
+from pygba.boot_cache import BootStateCache, cache_root
+from pygba.state_pool import StatePool
+from pygba.utils import KEY_MAP, compile_input_schedule
+
+
+# granularity of the lazily populated memory snapshot (see `PyGBA.read_memory`)
+PAGE_SIZE = 0x1000
+
+# address of the cartridge ROM
+ROM_ADDRESS = 0x08000000
+
+# read-only ROM copies shared by all PyGBA instances of this user, named by content hash
+_shared_roms = {}
+# digests whose shared copy was checked against its name by this process
+_verified_roms = set()
+
+
+def _weak_callback(method: Callable[[], Any]) -> Callable[[], None]:
+    # frame callbacks are stored by the core, a bound method would keep the PyGBA instance alive
+    method_ref = weakref.WeakMethod(method)
+
+    def callback():
+        method = method_ref()
+        if method is not None:
+            method()
+    return callback
+
+
+def shared_rom_dir() -> Path:
+    return cache_root() / "roms"
+
+
+def _is_valid_shared_rom(path: Path, rom_digest: str) -> bool:
+    stat = path.stat()
+    if hasattr(os, "getuid") and stat.st_uid != os.getuid():
+        return False
+    return hashlib.sha256(path.read_bytes()).hexdigest() == rom_digest
+
+
+def _get_shared_rom(gba_file: str) -> tuple[Path, str]:
+    path = Path(gba_file).resolve()
+    stat = path.stat()
+    key = (str(path), stat.st_size, stat.st_mtime_ns)
+    rom_data = None
+    if key not in _shared_roms:
+        rom_data = path.read_bytes()
+        _shared_roms[key] = hashlib.sha256(rom_data).hexdigest()
+    rom_digest = _shared_roms[key]
+
+    rom_dir = shared_rom_dir()
+    shared_rom = rom_dir / f"{rom_digest}.gba"
+    if rom_digest in _verified_roms and shared_rom.exists():
+        return shared_rom, rom_digest
+
+    # an existing copy is only reused if it belongs to this user and matches its digest
+    if not shared_rom.exists() or not _is_valid_shared_rom(shared_rom, rom_digest):
+        if rom_data is None:
+            rom_data = path.read_bytes()
+        rom_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=rom_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(rom_data)
+        os.chmod(tmp_path, 0o444)
+        # atomic, so concurrent workers never see a partially written ROM
+        os.replace(tmp_path, shared_rom)
+    _verified_roms.add(rom_digest)
+    return shared_rom, rom_digest
 
 
 class PyGBA:
     @staticmethod
-    def load(gba_file: str, save_file: str | None = None) -> "PyGBA":
-        # create a temporary directory and copy the gba file into it
+    def load(
+        gba_file: str,
+        save_file: str | None = None,
+        snapshot_memory: bool = False,
+        skip_unobserved_frames: bool = False,
+        boot_script=None,
+        boot_cache: BootStateCache | None = None,
+    ) -> "PyGBA":
+        # create a temporary directory per instance that links to the shared ROM and holds a copy of the save file
         # this is necessary to prevent mgba from overwriting the save file (and to prevent crashes)
-        tmp_dir = Path(tempfile.mkdtemp())
+        shared_rom, rom_digest = _get_shared_rom(gba_file)
+        tmp_dir = Path(tempfile.mkdtemp(prefix="pygba-"))
         tmp_gba = tmp_dir / "rom.gba"
-        tmp_gba.write_bytes(Path(gba_file).read_bytes())
+        try:
+            tmp_gba.symlink_to(shared_rom)
+        except OSError:
+            # symlinks may not be available (e.g. on Windows without developer mode)
+            shutil.copyfile(shared_rom, tmp_gba)
         gba_file = str(tmp_gba)
+        save_data = None
         if save_file is not None:
             tmp_save = tmp_dir / "rom.sav"
-            tmp_save.write_bytes(Path(save_file).read_bytes())
+            save_data = Path(save_file).read_bytes()
+            tmp_save.write_bytes(save_data)
             save_file = str(tmp_save)
 
         core = mgba.core.load_path(gba_file)
         if core is None:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
             raise ValueError(f"Failed to load GBA file: {gba_file}")
         if save_file is not None:
             core.autoload_save()
         core.reset()
-        return PyGBA(core)
+        gba = PyGBA(core, snapshot_memory=snapshot_memory, skip_unobserved_frames=skip_unobserved_frames)
+        gba._cleanup = weakref.finalize(gba, shutil.rmtree, tmp_dir, ignore_errors=True)
+        gba._rom_digest = rom_digest
+
+        if boot_script is not None:
+            boot_runs = compile_input_schedule(boot_script)
+            if boot_cache is None:
+                gba.run_schedule(boot_runs, return_state=False)
+                return gba
+
+            key = boot_cache.make_key(rom_digest, save_data, boot_runs)
+            state = boot_cache.get(key)
+            if state is None or not gba.load_state(state):
+                state, _ = gba.run_schedule(boot_runs)
+                boot_cache.put(key, bytes(ffi.buffer(state)))
+        return gba
     
-    def __init__(self, core: mgba.core.Core):
+    def __init__(
+        self,
+        core: mgba.core.Core,
+        snapshot_memory: bool = False,
+        skip_unobserved_frames: bool = False,
+    ):
         self.core = core
+        # if True, reads are served from a copy of the touched 4 KB pages that stays
+        # consistent until the next frame, otherwise reads go directly to emulator memory
+        self.snapshot_memory = snapshot_memory
+        # if True, mGBA only renders the last frame of every `run_frames` call
+        self.skip_unobserved_frames = skip_unobserved_frames
+        # the native video state, only exposed by GBA cores
+        self._video = getattr(getattr(core, "_native", None), "video", None)
+        if skip_unobserved_frames and self._video is None:
+            raise ValueError("skip_unobserved_frames requires a GBA core that exposes its video state")
 
-        self.core.add_frame_callback(self._invalidate_mem_cache)
+        self.core.add_frame_callback(_weak_callback(self._invalidate_mem_cache))
+        self._mem_regions = {}
         self._mem_cache = {}
+        self._cleanup = None
+        self._rom_digest = None
+        self.state_pool = StatePool(self)
 
-    def wait(self, frames: int):
+        # name -> (live view of the range, last seen contents)
+        self._watchpoints = {}
+        # name -> frame on which the last change was detected
+        self._watch_events = {}
+        self._watch_callback_added = False
+
+    @property
+    def rom_digest(self) -> str:
+        # identifies the ROM across instances, e.g. to share caches of constant ROM data
+        if self._rom_digest is None:
+            self._rom_digest = hashlib.sha256(self.get_memory_view(ROM_ADDRESS)).hexdigest()
+        return self._rom_digest
+
+    def close(self):
+        # removes the temporary files created by `PyGBA.load`
+        if self._cleanup is not None:
+            self._cleanup()
+
+    def __enter__(self) -> "PyGBA":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _skip_rendering(self, frames: int):
+        # mGBA doesn't draw scanlines while the video frameskip counter is positive,
+        # the counter is decremented at the end of every frame
+        if self._video is None:
+            raise RuntimeError("Cannot skip rendering on a core that doesn't expose its video state")
+        self._video.frameskipCounter = frames
+
+    def run_frames(self, frames: int, render_last: bool = True):
+        if frames <= 0:
+            return
+        if self.skip_unobserved_frames:
+            self._skip_rendering(frames - 1 if render_last else frames)
         for _ in range(frames):
             self.core.run_frame()
 
+    def wait(self, frames: int):
+        self.run_frames(frames)
+
+    def run_schedule(
+        self,
+        schedule,
+        capture_at: Iterable[int] = (),
+        capture_fn: Callable[["PyGBA"], Any] | None = None,
+        return_state: bool = True,
+    ) -> tuple[Any, list[Any]]:
+        """
+        Runs a whole input schedule (see `pygba.utils.compile_input_schedule`) in one call.
+
+        After each (zero-based) frame index in `capture_at` has been emulated, `capture_fn(self)` is
+        called and its result collected, by default this captures a raw savestate.
+        Returns the raw savestate after the last frame (if `return_state` is True) and the captures.
+        """
+        runs = compile_input_schedule(schedule)
+        total_frames = sum(frames for _, frames in runs)
+        capture_at = sorted(set(int(frame) for frame in capture_at))
+        if capture_at and (capture_at[0] < 0 or capture_at[-1] >= total_frames):
+            raise ValueError(f"Capture frames must be in [0, {total_frames})")
+        if capture_fn is None:
+            capture_fn = lambda gba: gba.core.save_raw_state()
+
+        captures = []
+        frame = 0
+        next_capture = 0
+        for keys, frames in runs:
+            self.core.set_keys(raw=keys)
+            run_end = frame + frames
+            while frame < run_end:
+                stop = run_end
+                capture = next_capture < len(capture_at) and capture_at[next_capture] < run_end
+                if capture:
+                    stop = capture_at[next_capture] + 1
+                self.run_frames(stop - frame, render_last=capture or stop == total_frames)
+                frame = stop
+                if capture:
+                    captures.append(capture_fn(self))
+                    next_capture += 1
+        self.core.set_keys(raw=0)
+
+        state = self.core.save_raw_state() if return_state else None
+        return state, captures
+
+    def save_state(self) -> bytes:
+        return bytes(ffi.buffer(self.core.save_raw_state()))
+
+    def load_state(self, state) -> bool:
+        if isinstance(state, (bytes, bytearray, memoryview)):
+            if len(state) != self.core._core.stateSize(self.core._core):
+                return False
+            state = ffi.from_buffer("unsigned char[]", state)
+        loaded = bool(self.core.load_raw_state(state))
+        # memory changed without a frame being emulated
+        self._invalidate_mem_cache()
+        self._check_watchpoints()
+        return loaded
+
     def press_key(self, key: str, frames: int = 2):
         if key not in KEY_MAP:
             raise ValueError(f"Invalid key: {key}")
@@ -47,9 +262,9 @@ class PyGBA:
         
         key = KEY_MAP[key]
         self.core.add_keys(key)
-        self.wait(frames - 1)
+        self.run_frames(frames - 1, render_last=False)
         self.core.clear_keys(key)
-        self.wait(1)
+        self.run_frames(1)
 
     def press_up(self, frames: int = 2):
         self.press_key("up", frames)
@@ -82,22 +297,57 @@ class PyGBA:
         self.press_key("select", frames)
 
     def _invalidate_mem_cache(self):
-        self._mem_cache = {}
-    
-    def _get_memory_region(self, region_id: int):
-        if region_id not in self._mem_cache:
+        if self._mem_cache:
+            self._mem_cache = {}
+
+    def _get_memory_region(self, region_id: int) -> memoryview:
+        # memory blocks are allocated once by mGBA, so the view stays valid for the lifetime of the core
+        if region_id not in self._mem_regions:
             mem_core = self.core.memory.u8._core
             size = ffi.new("size_t *")
             ptr = ffi.cast("uint8_t *", mem_core.getMemoryBlock(mem_core, region_id, size))
-            self._mem_cache[region_id] = ffi.buffer(ptr, size[0])[:]
-        return self._mem_cache[region_id]
+            self._mem_regions[region_id] = memoryview(ffi.buffer(ptr, size[0]))
+        return self._mem_regions[region_id]
+
+    def _read_pages(self, region_id: int, mem_region: memoryview, start: int, end: int) -> bytes:
+        first_page = start // PAGE_SIZE
+        last_page = (end - 1) // PAGE_SIZE
+        pages = []
+        for page in range(first_page, last_page + 1):
+            key = (region_id, page)
+            data = self._mem_cache.get(key)
+            if data is None:
+                data = mem_region[page * PAGE_SIZE:(page + 1) * PAGE_SIZE].tobytes()
+                self._mem_cache[key] = data
+            pages.append(data)
+        data = pages[0] if len(pages) == 1 else b"".join(pages)
+        offset = first_page * PAGE_SIZE
+        return data[start - offset:end - offset]
+
+    def get_memory_view(self, address: int, size: int | None = None) -> memoryview:
+        """
+        Returns a zero-copy view into emulator memory starting at `address`.
+        The contents of the view change as the emulator runs.
+        If `size` is None, the view extends to the end of the memory region.
+        """
+        region_id = address >> lib.BASE_OFFSET
+        mem_region = self._get_memory_region(region_id)
+        address &= len(mem_region) - 1
+        if size is None:
+            return mem_region[address:]
+        return mem_region[address:address + size]
 
-    def read_memory(self, address: int, size: int = 1):
+    def read_memory(self, address: int, size: int = 1) -> bytes:
         region_id = address >> lib.BASE_OFFSET
         mem_region = self._get_memory_region(region_id)
         mask = len(mem_region) - 1
         address &= mask
-        return mem_region[address:address + size]
+        end = min(address + size, len(mem_region))
+        if address >= end:
+            return b""
+        if self.snapshot_memory:
+            return self._read_pages(region_id, mem_region, address, end)
+        return mem_region[address:end].tobytes()
 
     def read_u8(self, address: int):
         return int.from_bytes(self.read_memory(address, 1), byteorder='little', signed=False)
@@ -107,3 +357,77 @@ class PyGBA:
 
     def read_u32(self, address: int):
         return int.from_bytes(self.read_memory(address, 4), byteorder='little', signed=False)
+
+    def read_array(self, address: int, count: int, dtype=np.uint8) -> np.ndarray:
+        # like `gather`, elements past the end of the memory region read as zero
+        dtype = np.dtype(dtype).newbyteorder("<")
+        data = self.read_memory(address, count * dtype.itemsize)
+        return np.frombuffer(data.ljust(count * dtype.itemsize, b"\0"), dtype=dtype, count=count).copy()
+
+    def gather(self, addresses, dtype=np.uint8) -> np.ndarray:
+        """
+        Reads one `dtype` value at each of `addresses`. Bytes past the end of a memory region are
+        missing, like with `read_memory`, and read as zero.
+        """
+        dtype = np.dtype(dtype).newbyteorder("<")
+        addresses = np.asarray(addresses, dtype=np.int64)
+        result = np.empty(addresses.shape, dtype=dtype)
+
+        # one read of the spanned range and one fancy-indexing call per memory region
+        byte_offsets = np.arange(dtype.itemsize)
+        region_ids = addresses >> lib.BASE_OFFSET
+        for region_id in np.unique(region_ids):
+            region_id = int(region_id)
+            mem_region = self._get_memory_region(region_id)
+            in_region = region_ids == region_id
+            offsets = addresses[in_region] & (len(mem_region) - 1)
+            start = int(offsets.min())
+            end = int(offsets.max()) + dtype.itemsize
+            if self.snapshot_memory:
+                span = self._read_pages(region_id, mem_region, start, min(end, len(mem_region)))
+                span = np.frombuffer(span, dtype=np.uint8)
+            else:
+                span = np.frombuffer(mem_region, dtype=np.uint8)[start:end]
+            if len(span) < end - start:
+                span = np.concatenate([span, np.zeros(end - start - len(span), dtype=np.uint8)])
+            values = span[(offsets - start)[:, None] + byte_offsets]
+            result[in_region] = values.view(dtype)[:, 0]
+        return result
+
+    def watch(self, name, address: int, size: int):
+        """
+        Watches `size` bytes starting at `address`. The range is compared to its previous contents
+        after every frame and changes can be queried with `get_changes` or `has_changed`.
+        """
+        if not self._watch_callback_added:
+            self.core.add_frame_callback(_weak_callback(self._check_watchpoints))
+            self._watch_callback_added = True
+        # cffi buffers compare with memcmp, so unchanged ranges are never copied
+        live = ffi.buffer(ffi.from_buffer(self.get_memory_view(address, size)))
+        self._watchpoints[name] = (live, live[:])
+        self._watch_events.pop(name, None)
+
+    def unwatch(self, name):
+        self._watchpoints.pop(name, None)
+        self._watch_events.pop(name, None)
+
+    def _check_watchpoints(self):
+        if not self._watchpoints:
+            return
+        frame = self.core.frame_counter
+        for name, (live, last) in self._watchpoints.items():
+            if live != last:
+                self._watchpoints[name] = (live, live[:])
+                self._watch_events[name] = frame
+
+    def has_changed(self, name) -> bool:
+        return name in self._watch_events
+
+    def get_changes(self, clear: bool = True) -> dict[Any, int]:
+        # returns the watched ranges that changed since the last call, mapped to the frame of their last change
+        changes = self._watch_events
+        if clear:
+            self._watch_events = {}
+        else:
+            changes = changes.copy()
+        return changes
@@ -0,0 +1,206 @@
+import itertools
+import json
+import queue
+import threading
+import zlib
+from pathlib import Path
+from typing import Literal
+
+import numpy as np
+
+
+_FORMATS = ("png", "zlib", "zstd", "npz")
+
+# queue message telling the writer thread to stop
+_STOP = object()
+
+
+def _zstd_compressor():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError("zstandard is not installed, run `pip install zstandard`") from e
+    return zstandard.ZstdCompressor(level=3)
+
+
+class EpisodeRecorder:
+    """
+    Records the screen of sampled episodes to disk without blocking the stepping thread.
+
+    Frames are pushed into a bounded queue and written by a background thread, every episode
+    goes into its own directory as PNG images, zlib or zstd compressed blocks of raw RGB frames
+    or `.npz` chunks. Only every `record_every`-th episode is recorded. Frames are dropped
+    (and counted in `dropped_frames`) when the queue is full, unless `block` is set.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        format: Literal["png", "zlib", "zstd", "npz"] = "npz",
+        record_every: int = 1,
+        chunk_size: int = 256,
+        max_queue: int = 1024,
+        block: bool = False,
+    ):
+        if format not in _FORMATS:
+            raise ValueError(f"Invalid format: {format} (must be one of {list(_FORMATS)})")
+        if record_every < 1 or chunk_size < 1:
+            raise ValueError("record_every and chunk_size must be at least 1")
+        self.directory = Path(directory)
+        self.format = format
+        self.record_every = record_every
+        self.chunk_size = chunk_size
+        self.block = block
+        self.dropped_frames = 0
+        self.closed = False
+
+        self._zstd = _zstd_compressor() if format == "zstd" else None
+        self._episodes = itertools.count()
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._error = None
+
+    def start_episode(self) -> int | None:
+        """
+        Starts a new episode and returns its id if it's sampled for recording, otherwise None.
+        """
+        self._check_error()
+        if self.closed:
+            raise RuntimeError("Cannot record to a closed recorder")
+        with self._lock:
+            episode = next(self._episodes)
+            if episode % self.record_every != 0:
+                return None
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="pygba-recorder", daemon=True)
+                self._thread.start()
+        return episode
+
+    def add_frame(self, episode: int, frame: np.ndarray):
+        # the copy is the only work done on the calling thread
+        frame = np.array(frame, dtype=np.uint8)
+        if self.block:
+            self._queue.put(("frame", episode, frame))
+            return
+        try:
+            self._queue.put_nowait(("frame", episode, frame))
+        except queue.Full:
+            self.dropped_frames += 1
+
+    def end_episode(self, episode: int):
+        self._check_error()
+        self._queue.put(("end", episode, None))
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._check_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _check_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Recording failed in the writer thread") from error
+
+    def _run(self):
+        # episode -> frames of the current chunk, number of written frames and chunk files
+        episodes = {}
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            kind, episode, frame = item
+            try:
+                if kind == "frame":
+                    state = episodes.setdefault(episode, {"frames": [], "num_frames": 0, "chunks": []})
+                    state["frames"].append(frame)
+                    if len(state["frames"]) >= self.chunk_size:
+                        self._flush(episode, state)
+                elif episode in episodes:
+                    self._finish(episode, episodes.pop(episode))
+            except Exception as e:
+                self._error = e
+                episodes.pop(episode, None)
+
+        for episode, state in episodes.items():
+            try:
+                self._finish(episode, state)
+            except Exception as e:
+                self._error = e
+
+    def _episode_dir(self, episode: int) -> Path:
+        path = self.directory / f"episode_{episode:06d}"
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def _flush(self, episode: int, state: dict):
+        if not state["frames"]:
+            return
+        path = self._episode_dir(episode)
+        # frames are pushed as RGBX, the padding channel is dropped here
+        block = np.stack(state["frames"])[..., :3]
+        state["frames"] = []
+        state["frame_shape"] = list(block.shape[1:])
+        chunks = state["chunks"]
+
+        if self.format == "png":
+            from PIL import Image
+            for i, frame in enumerate(block, start=state["num_frames"]):
+                name = f"frame_{i:06d}.png"
+                Image.fromarray(frame).save(path / name)
+                chunks.append(name)
+        elif self.format == "npz":
+            name = f"chunk_{len(chunks):05d}.npz"
+            np.savez_compressed(path / name, frames=block)
+            chunks.append(name)
+        else:
+            data = np.ascontiguousarray(block).tobytes()
+            data = zlib.compress(data, 1) if self.format == "zlib" else self._zstd.compress(data)
+            name = f"chunk_{len(chunks):05d}.{self.format}"
+            (path / name).write_bytes(data)
+            chunks.append(name)
+        state["num_frames"] += len(block)
+
+    def _finish(self, episode: int, state: dict):
+        self._flush(episode, state)
+        if state["num_frames"] == 0:
+            return
+        meta = {
+            "format": self.format,
+            "num_frames": state["num_frames"],
+            "frame_shape": state["frame_shape"],
+            "chunks": state["chunks"],
+        }
+        (self._episode_dir(episode) / "episode.json").write_text(json.dumps(meta))
+
+
+def load_episode(path: str | Path) -> np.ndarray:
+    """
+    Loads the frames of an episode written by `EpisodeRecorder` as a (frames, height, width, 3) array.
+    """
+    path = Path(path)
+    meta = json.loads((path / "episode.json").read_text())
+    format = meta["format"]
+    if format == "png":
+        from PIL import Image
+        return np.stack([np.asarray(Image.open(path / name).convert("RGB")) for name in meta["chunks"]])
+    if format == "npz":
+        return np.concatenate([np.load(path / name)["frames"] for name in meta["chunks"]])
+
+    if format == "zstd":
+        import zstandard
+        decompress = zstandard.ZstdDecompressor().decompress
+    else:
+        decompress = zlib.decompress
+    data = b"".join(decompress((path / name).read_bytes()) for name in meta["chunks"])
+    return np.frombuffer(data, dtype=np.uint8).reshape(-1, *meta["frame_shape"])
@@ -0,0 +1,138 @@
+import struct
+import zlib
+
+import numpy as np
+
+
+# depth, state size, block size, number of changed blocks, is compressed
+_HEADER = struct.Struct("<IIIIB")
+
+
+class EncodedState:
+    """
+    A savestate stored either as a keyframe (`base` is None) or as the XOR of the changed blocks
+    relative to the decoded `base` state.
+    """
+
+    __slots__ = ("base", "depth", "size", "block_size", "block_indices", "payload", "compressed")
+
+    def __init__(
+        self,
+        base: "EncodedState | None",
+        size: int,
+        block_size: int,
+        block_indices: np.ndarray | None,
+        payload: bytes,
+        compressed: bool,
+    ):
+        self.base = base
+        self.depth = 0 if base is None else base.depth + 1
+        self.size = size
+        self.block_size = block_size
+        self.block_indices = block_indices
+        self.payload = payload
+        self.compressed = compressed
+
+    @property
+    def is_keyframe(self) -> bool:
+        return self.base is None
+
+    @property
+    def nbytes(self) -> int:
+        indices_nbytes = 0 if self.block_indices is None else self.block_indices.nbytes
+        return _HEADER.size + indices_nbytes + len(self.payload)
+
+    def to_bytes(self) -> bytes:
+        num_blocks = 0 if self.block_indices is None else len(self.block_indices)
+        header = _HEADER.pack(self.depth, self.size, self.block_size, num_blocks, self.compressed)
+        indices = b"" if self.block_indices is None else self.block_indices.astype("<u4").tobytes()
+        return header + indices + self.payload
+
+    @staticmethod
+    def from_bytes(data: bytes, base: "EncodedState | None" = None) -> "EncodedState":
+        depth, size, block_size, num_blocks, compressed = _HEADER.unpack_from(data)
+        if (depth == 0) != (base is None) or (base is not None and base.depth != depth - 1):
+            raise ValueError("Base state doesn't match the encoded chain depth")
+        offset = _HEADER.size
+        block_indices = None
+        if depth > 0:
+            block_indices = np.frombuffer(data, dtype="<u4", count=num_blocks, offset=offset).astype(np.int64)
+            offset += 4 * num_blocks
+        return EncodedState(base, size, block_size, block_indices, data[offset:], bool(compressed))
+
+
+class DeltaStateCodec:
+    """
+    Encodes savestates as sparse XOR block deltas against a previously encoded state.
+
+    Every state whose base is `max_chain_depth` deltas away from a keyframe is stored as a new
+    keyframe, which bounds the cost of decoding.
+    """
+
+    def __init__(self, block_size: int = 64, max_chain_depth: int = 16, compress: bool = False):
+        if block_size <= 0:
+            raise ValueError(f"Invalid block size: {block_size}")
+        self.block_size = block_size
+        self.max_chain_depth = max_chain_depth
+        self.compress = compress
+
+    def _blocks(self, state, block_size: int | None = None) -> np.ndarray:
+        block_size = block_size or self.block_size
+        data = np.frombuffer(state, dtype=np.uint8)
+        num_blocks = -(-len(data) // block_size)
+        blocks = np.zeros(num_blocks * block_size, dtype=np.uint8)
+        blocks[:len(data)] = data
+        return blocks.reshape(num_blocks, block_size)
+
+    def encode(
+        self,
+        state,
+        base: EncodedState | None = None,
+        base_state: bytes | None = None,
+    ) -> EncodedState:
+        """
+        Encodes `state` relative to `base`. If the decoded base state is already at hand,
+        passing it as `base_state` avoids decoding the base chain.
+        """
+        size = len(state)
+        if (
+            base is None
+            or base.depth >= self.max_chain_depth
+            or base.size != size
+            or base.block_size != self.block_size
+        ):
+            payload = bytes(state)
+            if self.compress:
+                payload = zlib.compress(payload, 1)
+            return EncodedState(None, size, self.block_size, None, payload, self.compress)
+
+        if base_state is None:
+            base_state = self.decode(base)
+        diff = self._blocks(state)
+        np.bitwise_xor(diff, self._blocks(base_state), out=diff)
+        block_indices = np.flatnonzero(diff.any(axis=1))
+        payload = diff[block_indices].tobytes()
+        if self.compress:
+            payload = zlib.compress(payload, 1)
+        return EncodedState(base, size, self.block_size, block_indices, payload, self.compress)
+
+    def decode(self, encoded: EncodedState) -> bytes:
+        chain = []
+        while encoded.base is not None:
+            chain.append(encoded)
+            encoded = encoded.base
+
+        payload = zlib.decompress(encoded.payload) if encoded.compressed else encoded.payload
+        if not chain:
+            return payload
+
+        # the chain is decoded with its own block size, which may differ from this codec's
+        block_size = chain[0].block_size
+        if any(delta.block_size != block_size for delta in chain):
+            raise ValueError("Encoded states in a delta chain must share one block size")
+        state = self._blocks(payload, block_size)
+        for delta in reversed(chain):
+            payload = zlib.decompress(delta.payload) if delta.compressed else delta.payload
+            changed = np.frombuffer(payload, dtype=np.uint8).reshape(-1, delta.block_size)
+            state[delta.block_indices] ^= changed
+        return state.reshape(-1)[:encoded.size].tobytes()
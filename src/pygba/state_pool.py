@@ -0,0 +1,124 @@
+import itertools
+import lzma
+import weakref
+import zlib
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    from pygba.pygba import PyGBA
+
+
+_COMPRESSORS = {
+    "zlib": (lambda data: zlib.compress(data, 1), zlib.decompress),
+    "lzma": (lambda data: lzma.compress(data, preset=0), lzma.decompress),
+}
+
+
+class StatePool:
+    """
+    An in-memory pool of savestates addressed by integer handles.
+
+    The `hot_states` most recently used states are kept as raw bytes, colder ones are compressed
+    if `compression` is set. Once the pool exceeds `max_bytes` or `max_states`, the least recently
+    used states are evicted and their handles become invalid. The pool only keeps a weak reference
+    to `gba`.
+    """
+
+    def __init__(
+        self,
+        gba: "PyGBA",
+        max_bytes: int | None = None,
+        max_states: int | None = None,
+        compression: Literal["zlib", "lzma"] | None = None,
+        hot_states: int = 16,
+    ):
+        if compression is not None and compression not in _COMPRESSORS:
+            raise ValueError(f"Invalid compression: {compression} (must be one of {list(_COMPRESSORS)})")
+        # weak, so that `PyGBA.state_pool` doesn't put every instance into a reference cycle
+        self._gba = weakref.ref(gba)
+        self.max_bytes = max_bytes
+        self.max_states = max_states
+        self.compression = compression
+        self.hot_states = hot_states
+        self.nbytes = 0
+
+        self._handles = itertools.count()
+        # handle -> (data, is_compressed), in LRU order
+        self._states = OrderedDict()
+        # handles of uncompressed states, in LRU order
+        self._hot = OrderedDict()
+
+    @property
+    def gba(self) -> "PyGBA":
+        gba = self._gba()
+        if gba is None:
+            raise RuntimeError("The PyGBA instance of this state pool no longer exists")
+        return gba
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __contains__(self, handle: int) -> bool:
+        return handle in self._states
+
+    def snapshot(self) -> int:
+        handle = next(self._handles)
+        self._add(handle, self.gba.save_state())
+        self._shrink()
+        return handle
+
+    def get(self, handle: int) -> bytes:
+        if handle not in self._states:
+            raise KeyError(f"Unknown or evicted state handle: {handle}")
+        data, compressed = self._states[handle]
+        if compressed:
+            self._remove(handle)
+            data = _COMPRESSORS[self.compression][1](data)
+            self._add(handle, data)
+        else:
+            self._states.move_to_end(handle)
+            self._hot.move_to_end(handle)
+        return data
+
+    def restore(self, handle: int) -> bool:
+        state = self.get(handle)
+        loaded = self.gba.load_state(state)
+        self._shrink()
+        return loaded
+
+    def discard(self, handle: int):
+        if handle in self._states:
+            self._remove(handle)
+
+    def clear(self):
+        self._states.clear()
+        self._hot.clear()
+        self.nbytes = 0
+
+    def _add(self, handle: int, data: bytes):
+        self._states[handle] = (data, False)
+        self._hot[handle] = None
+        self.nbytes += len(data)
+
+    def _remove(self, handle: int):
+        data, _ = self._states.pop(handle)
+        self._hot.pop(handle, None)
+        self.nbytes -= len(data)
+
+    def _shrink(self):
+        if self.compression is not None:
+            compress = _COMPRESSORS[self.compression][0]
+            while len(self._hot) > self.hot_states:
+                handle, _ = self._hot.popitem(last=False)
+                data, _ = self._states[handle]
+                compressed = compress(data)
+                self._states[handle] = (compressed, True)
+                self.nbytes += len(compressed) - len(data)
+
+        while self._states and (
+            (self.max_bytes is not None and self.nbytes > self.max_bytes)
+            or (self.max_states is not None and len(self._states) > self.max_states)
+        ):
+            handle = next(iter(self._states))
+            self._remove(handle)
@@ -1,3 +1,6 @@
+from typing import Iterable
+
+import numpy as np
 from mgba.gba import GBA
 
 KEY_MAP = {
@@ -13,6 +16,54 @@ KEY_MAP = {
     "select": GBA.KEY_SELECT,
 }
 
+
+def keys_to_mask(keys: int | str | Iterable[str | None] | None) -> int:
+    if keys is None:
+        return 0
+    if isinstance(keys, (int, np.integer)):
+        return int(keys)
+    if isinstance(keys, str):
+        keys = [keys]
+    mask = 0
+    for key in keys:
+        if key is None:
+            continue
+        if key not in KEY_MAP:
+            raise ValueError(f"Invalid key: {key}")
+        mask |= 1 << KEY_MAP[key]
+    return mask
+
+
+def compile_input_schedule(schedule) -> list[tuple[int, int]]:
+    """
+    Compiles an input schedule into run-length encoded `(key_mask, frames)` pairs.
+
+    The schedule can either be an array of per-frame key bitmasks or a sequence of
+    `(keys, frames)` pairs, where `keys` is a bitmask, a key name, a list of key names or None.
+    """
+    if isinstance(schedule, np.ndarray) or (
+        len(schedule) > 0 and isinstance(schedule[0], (int, np.integer))
+    ):
+        masks = np.asarray(schedule, dtype=np.int64).ravel()
+        if len(masks) == 0:
+            return []
+        starts = np.flatnonzero(np.diff(masks, prepend=masks[0] - 1))
+        lengths = np.diff(starts, append=len(masks))
+        return [(int(masks[i]), int(n)) for i, n in zip(starts, lengths)]
+
+    runs = []
+    for keys, frames in schedule:
+        if frames < 0:
+            raise ValueError(f"Invalid number of frames: {frames}")
+        if frames == 0:
+            continue
+        mask = keys_to_mask(keys)
+        if runs and runs[-1][0] == mask:
+            runs[-1] = (mask, runs[-1][1] + frames)
+        else:
+            runs.append((mask, frames))
+    return runs
+
 class BaseCharmap:
     charmap: list[str]
     terminator: int
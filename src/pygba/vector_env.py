@@ -0,0 +1,378 @@
+import multiprocessing
+import os
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable
+
+import gymnasium as gym
+import numpy as np
+from gymnasium.vector import AutoresetMode
+from gymnasium.vector.utils import batch_space
+
+from .pygba import PyGBA
+from .gym_env import PyGBAEnv
+from .game_wrappers.base import GameWrapper
+
+
+def _add_info(infos: dict[str, Any], info: dict[str, Any], index: int, num_envs: int):
+    # same layout as gymnasium's vector envs: one array per key plus a `_key` mask
+    for key, value in info.items():
+        if key not in infos:
+            infos[key] = np.full(num_envs, None, dtype=object)
+            infos[f"_{key}"] = np.zeros(num_envs, dtype=bool)
+        infos[key][index] = value
+        infos[f"_{key}"][index] = True
+    return infos
+
+
+class PyGBAVectorEnv(gym.vector.VectorEnv):
+    """
+    Steps N PyGBA cores in the current process and writes their observations into one contiguous
+    batch buffer. With `num_threads`, the cores are stepped concurrently by a thread pool.
+    Sub-environments that terminate or truncate are reset in the same step, the final observation
+    and info are returned in `infos["final_obs"]` and `infos["final_info"]`.
+    """
+
+    metadata = {
+        "render_modes": [],
+        "autoreset_mode": AutoresetMode.SAME_STEP,
+    }
+
+    def __init__(
+        self,
+        gbas: list[PyGBA],
+        game_wrappers: list[GameWrapper | None] | None = None,
+        copy_observation: bool = True,
+        num_threads: int | None = None,
+        **env_kwargs,
+    ):
+        if len(gbas) == 0:
+            raise ValueError("Need at least one PyGBA instance")
+        if game_wrappers is None:
+            game_wrappers = [None] * len(gbas)
+        if len(game_wrappers) != len(gbas):
+            raise ValueError(f"Got {len(game_wrappers)} game wrappers for {len(gbas)} PyGBA instances")
+
+        self.envs = [
+            PyGBAEnv(gba, game_wrapper, copy_observation=False, **env_kwargs)
+            for gba, game_wrapper in zip(gbas, game_wrappers)
+        ]
+        self.num_envs = len(self.envs)
+        self.copy_observation = copy_observation
+        self.render_mode = None
+        self.closed = False
+
+        if self.envs[0].obs_type == "dict":
+            raise ValueError("dict observations are not supported by vector environments")
+        self.single_observation_space = self.envs[0].observation_space
+        self.single_action_space = self.envs[0].action_space
+        self.observation_space = batch_space(self.single_observation_space, self.num_envs)
+        self.action_space = batch_space(self.single_action_space, self.num_envs)
+
+        # every sub-env renders straight into its slice of the batch buffer,
+        # stacked frames are copied from the sub-env's ring buffer
+        env = self.envs[0]
+        self._stacked = env.frame_stack > 1
+        buffer_shape = ((env.frame_stack,) if self._stacked else ()) + env._obs_buffer.shape
+        self._obs_buffer = np.zeros((self.num_envs,) + buffer_shape, dtype=np.uint8)
+        if not self._stacked:
+            for i, env in enumerate(self.envs):
+                env._obs_buffer = self._obs_buffer[i]
+        self._observations = self.envs[0]._observation_view(self._obs_buffer)
+
+        self._rewards = np.zeros(self.num_envs, dtype=np.float64)
+        self._terminations = np.zeros(self.num_envs, dtype=bool)
+        self._truncations = np.zeros(self.num_envs, dtype=bool)
+
+        # mGBA releases the GIL while emulating, so sub-envs can be stepped concurrently by threads
+        self._executor = ThreadPoolExecutor(num_threads, thread_name_prefix="pygba-vec") if num_threads else None
+        self._pending = None
+
+    def _get_observations(self) -> np.ndarray:
+        return self._observations.copy() if self.copy_observation else self._observations
+
+    def reset(self, seed: int | list[int] | None = None, options: dict[str, Any] | None = None):
+        if seed is not None:
+            seeds = seed if isinstance(seed, list) else [seed + i for i in range(self.num_envs)]
+        else:
+            seeds = [None] * self.num_envs
+
+        infos = {}
+        for i, (env, env_seed) in enumerate(zip(self.envs, seeds)):
+            _, info = env.reset(seed=env_seed, options=options)
+            if self._stacked:
+                np.copyto(self._obs_buffer[i], env._stack_window())
+            _add_info(infos, info, i, self.num_envs)
+        return self._get_observations(), infos
+
+    def _step_env(self, index: int, action: int):
+        env = self.envs[index]
+        observation, reward, done, truncated, info = env.step(action)
+        final = None
+        if done or truncated:
+            final = {"final_obs": observation.copy(), "final_info": info}
+            _, info = env.reset()
+        if self._stacked:
+            np.copyto(self._obs_buffer[index], env._stack_window())
+        return reward, done, truncated, info, final
+
+    def step_async(self, actions):
+        actions = [int(action) for action in np.asarray(actions)]
+        if self._executor is not None:
+            self._pending = [
+                self._executor.submit(self._step_env, i, action)
+                for i, action in enumerate(actions)
+            ]
+        else:
+            self._pending = actions
+
+    def step_wait(self):
+        if self._pending is None:
+            raise RuntimeError("Calling step_wait without a pending step_async")
+        pending, self._pending = self._pending, None
+        if self._executor is not None:
+            results = [future.result() for future in pending]
+        else:
+            results = [self._step_env(i, action) for i, action in enumerate(pending)]
+
+        infos = {}
+        for i, (reward, done, truncated, info, final) in enumerate(results):
+            self._rewards[i] = reward
+            self._terminations[i] = done
+            self._truncations[i] = truncated
+            if final is not None:
+                _add_info(infos, final, i, self.num_envs)
+            _add_info(infos, info, i, self.num_envs)
+
+        return (
+            self._get_observations(),
+            self._rewards.copy(),
+            self._terminations.copy(),
+            self._truncations.copy(),
+            infos,
+        )
+
+    def step(self, actions):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close_extras(self, **kwargs):
+        if self._executor is not None:
+            self._executor.shutdown()
+        for env in self.envs:
+            env.close()
+
+    def close(self, **kwargs):
+        if self.closed:
+            return
+        self.close_extras(**kwargs)
+        self.closed = True
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    try:
+        # the parent process owns the segment, so workers must not unlink it on exit
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # `track` was added in Python 3.13, before that workers register the segment
+        # with the resource tracker they share with the parent, which is a no-op
+        return shared_memory.SharedMemory(name=name)
+
+
+def _subproc_worker(index, env_fn, conn, cpu, info_keys):
+    if cpu is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {cpu})
+
+    env = env_fn()
+    env.copy_observation = False
+    stacked = env.frame_stack > 1
+    env_buffer_shape = ((env.frame_stack,) if stacked else ()) + env._obs_buffer.shape
+    # axis of the env buffer that has to be swapped with the next one to get observations
+    height_axis = None if not env._has_screen else len(env_buffer_shape) - (3 if env.screen_type == "rgb" else 2)
+    conn.send((env.observation_space, env.action_space, env_buffer_shape, height_axis))
+
+    shm_name, buffer_shape = conn.recv()
+    shm = _attach_shared_memory(shm_name)
+    obs_buffer = np.ndarray(buffer_shape, dtype=np.uint8, buffer=shm.buf)
+    # the env renders straight into its slot of the shared buffer,
+    # stacked frames are copied from the env's ring buffer
+    if not stacked:
+        env._obs_buffer = obs_buffer[index]
+
+    def filter_info(info):
+        return {key: info[key] for key in info_keys if key in info}
+
+    try:
+        while True:
+            command, data = conn.recv()
+            if command == "step":
+                observation, reward, done, truncated, info = env.step(data)
+                info = filter_info(info)
+                final = None
+                if done or truncated:
+                    # the reset overwrites the slot, so the final observation is sent over the pipe
+                    final = {"final_obs": observation.copy(), "final_info": info}
+                    _, info = env.reset()
+                    info = filter_info(info)
+                if stacked:
+                    np.copyto(obs_buffer[index], env._stack_window())
+                conn.send((reward, done, truncated, info, final))
+            elif command == "reset":
+                _, info = env.reset(seed=data[0], options=data[1])
+                if stacked:
+                    np.copyto(obs_buffer[index], env._stack_window())
+                conn.send(filter_info(info))
+            elif command == "close":
+                break
+            else:
+                raise ValueError(f"Unknown command: {command}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        env.close()
+        del obs_buffer, env
+        shm.close()
+        conn.close()
+
+
+class PyGBASubprocVectorEnv(gym.vector.VectorEnv):
+    """
+    Runs one `PyGBAEnv` per worker process. Workers render observations into slots of a shared
+    memory buffer and only send rewards, done flags and the selected `info_keys` back over a pipe.
+    Sub-environments that terminate or truncate are reset in the same step, their final observation
+    and the selected keys of their final info are returned in `infos["final_obs"]` and `infos["final_info"]`.
+
+    `env_fns` are called in the worker processes and must return a `PyGBAEnv`. If `cpu_affinity` is
+    True, worker i is pinned to the i-th available CPU, a list pins worker i to `cpu_affinity[i]`.
+    """
+
+    metadata = {
+        "render_modes": [],
+        "autoreset_mode": AutoresetMode.SAME_STEP,
+    }
+
+    def __init__(
+        self,
+        env_fns: list[Callable[[], PyGBAEnv]],
+        info_keys: tuple[str, ...] = (),
+        cpu_affinity: bool | list[int] | None = None,
+        copy_observation: bool = True,
+        context: str | None = None,
+    ):
+        self.num_envs = len(env_fns)
+        self.copy_observation = copy_observation
+        self.render_mode = None
+        self.closed = False
+
+        if cpu_affinity is True:
+            available = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+            cpus = [available[i % len(available)] for i in range(self.num_envs)] if available else [None] * self.num_envs
+        elif cpu_affinity:
+            cpus = list(cpu_affinity)
+            if len(cpus) != self.num_envs:
+                raise ValueError(f"Got {len(cpus)} CPUs in cpu_affinity for {self.num_envs} environments")
+        else:
+            cpus = [None] * self.num_envs
+
+        ctx = multiprocessing.get_context(context)
+        if os.name == "posix":
+            # start the resource tracker before the workers, so that they share it with this process
+            resource_tracker.ensure_running()
+        self._conns = []
+        self._processes = []
+        for i, env_fn in enumerate(env_fns):
+            parent_conn, child_conn = ctx.Pipe()
+            process = ctx.Process(
+                target=_subproc_worker,
+                args=(i, env_fn, child_conn, cpus[i], tuple(info_keys)),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            self._conns.append(parent_conn)
+            self._processes.append(process)
+
+        spaces = [conn.recv() for conn in self._conns]
+        self.single_observation_space, self.single_action_space, env_buffer_shape, height_axis = spaces[0]
+        if isinstance(self.single_observation_space, gym.spaces.Dict):
+            for process in self._processes:
+                process.terminate()
+                process.join()
+            raise ValueError("dict observations are not supported by vector environments")
+        self.observation_space = batch_space(self.single_observation_space, self.num_envs)
+        self.action_space = batch_space(self.single_action_space, self.num_envs)
+
+        buffer_shape = (self.num_envs,) + tuple(env_buffer_shape)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(buffer_shape))))
+        self._obs_buffer = np.ndarray(buffer_shape, dtype=np.uint8, buffer=self._shm.buf)
+        if height_axis is not None:
+            self._observations = self._obs_buffer.swapaxes(height_axis + 1, height_axis + 2)
+        else:
+            self._observations = self._obs_buffer
+        for conn in self._conns:
+            conn.send((self._shm.name, buffer_shape))
+
+        self._rewards = np.zeros(self.num_envs, dtype=np.float64)
+        self._terminations = np.zeros(self.num_envs, dtype=bool)
+        self._truncations = np.zeros(self.num_envs, dtype=bool)
+
+    def _get_observations(self) -> np.ndarray:
+        return self._observations.copy() if self.copy_observation else self._observations
+
+    def reset(self, seed: int | list[int] | None = None, options: dict[str, Any] | None = None):
+        if seed is not None:
+            seeds = seed if isinstance(seed, list) else [seed + i for i in range(self.num_envs)]
+        else:
+            seeds = [None] * self.num_envs
+        for conn, env_seed in zip(self._conns, seeds):
+            conn.send(("reset", (env_seed, options)))
+
+        infos = {}
+        for i, conn in enumerate(self._conns):
+            _add_info(infos, conn.recv(), i, self.num_envs)
+        return self._get_observations(), infos
+
+    def step_async(self, actions):
+        for conn, action in zip(self._conns, np.asarray(actions)):
+            conn.send(("step", int(action)))
+
+    def step_wait(self):
+        infos = {}
+        for i, conn in enumerate(self._conns):
+            reward, done, truncated, info, final = conn.recv()
+            self._rewards[i] = reward
+            self._terminations[i] = done
+            self._truncations[i] = truncated
+            if final is not None:
+                _add_info(infos, final, i, self.num_envs)
+            _add_info(infos, info, i, self.num_envs)
+
+        return (
+            self._get_observations(),
+            self._rewards.copy(),
+            self._terminations.copy(),
+            self._truncations.copy(),
+            infos,
+        )
+
+    def step(self, actions):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close(self, **kwargs):
+        if self.closed:
+            return
+        for conn in self._conns:
+            try:
+                conn.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join()
+        for conn in self._conns:
+            conn.close()
+
+        del self._observations, self._obs_buffer
+        self._shm.close()
+        self._shm.unlink()
+        self.closed = True
@@ -7,7 +7,7 @@ import mgba.vfs
 import mgba.image
 import mgba.log
 
-from pygba import PyGBA, PyGBAEnv, PokemonEmerald
+from pygba import PyGBA, PyGBAEnv, PokemonEmerald, BootStateCache
 from custom_wrapper import CustomEmeraldWrapper
 from pygba.game_wrappers.pokemon_emerald import get_game_state
 
@@ -15,19 +15,13 @@ mgba.log.silence()
 
 
 def load_pokemon_game(gba_file: str, save_file: str | None = None):
-    gba = PyGBA.load(gba_file, save_file=save_file)
     if save_file is not None:
         # skip loading screen
-        for _ in range(16):
-            gba.press_a(30)
-        gba.wait(60)
+        boot_script = [("A", 29), (None, 1)] * 16 + [(None, 60)]
     else:
         # skip loading screen and character creation
-        gba.wait(600)
-        for _ in range(120):
-            gba.press_a(30)
-        gba.wait(720)
-    return gba
+        boot_script = [(None, 600)] + [("A", 29), (None, 1)] * 120 + [(None, 720)]
+    return PyGBA.load(gba_file, save_file=save_file, boot_script=boot_script, boot_cache=BootStateCache())
 
 
 
@@ -188,7 +182,7 @@ def main():
     gba = load_pokemon_game(gba_file, save_file=save_file)
     emerald_wrapper = PokemonEmerald()
     env = PyGBAEnv(gba, emerald_wrapper, frameskip=8, render_mode="human")
-    state = emerald_wrapper.game_state(gba)
+    state = emerald_wrapper.game_state(gba).to_dict()
     del state["pokedex"]
     del state["boxes"]
     del state["script_flags"]